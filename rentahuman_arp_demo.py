@@ -6,8 +6,20 @@ Shows how human verification + agent reputation create unified trust
 
 import asyncio
 import json
+import sys
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "skills"))
+from arp_resilience import ResilientLookup
+
+MAX_CONCURRENT_CHECKS = 32  # Wallets checked at once by check_combined_trust_many
+TRUST_TTL = 30.0  # Seconds a combined trust decision is served from cache
+NEGATIVE_TTL = 5.0  # Seconds a failed lookup is remembered before retrying
+UPSTREAM_DEADLINE = 0.5  # Seconds a gate check waits on Rentahuman before falling back
 
 @dataclass
 class RentahumanResult:
@@ -31,6 +43,7 @@ class CombinedTrust:
     trust_level: str
     color: str
     recommendation: str
+    degraded: bool = False  # Rentahuman status is a fallback, not a fresh answer
 
 # Simulated Rentahuman API
 async def check_rentahuman(wallet: str) -> RentahumanResult:
@@ -60,6 +73,13 @@ async def check_rentahuman(wallet: str) -> RentahumanResult:
         tier=tier
     )
 
+def unverified_human(wallet: str) -> RentahumanResult:
+    """Status assumed while Rentahuman cannot answer: not verified"""
+    return RentahumanResult(verified=False, score=0, verified_at="N/A", tier="Bronze")
+
+# Hedged, circuit-broken Rentahuman lookups; see arp_resilience
+rentahuman_lookup = ResilientLookup(check_rentahuman, unverified_human, deadline=UPSTREAM_DEADLINE)
+
 # Simulated ARP API  
 async def check_arp(wallet: str) -> ARPResult:
     """Check agent reputation on ARP"""
@@ -101,9 +121,14 @@ def calculate_combined_trust(human: RentahumanResult, arp: ARPResult) -> tuple[s
         return "🔴 BLOCK", "red", "Access denied. Insufficient trust signals."
 
 async def check_combined_trust(wallet: str) -> CombinedTrust:
-    """Check both and return combined trust"""
-    human = await check_rentahuman(wallet)
-    arp = await check_arp(wallet)
+    """Check both and return combined trust
+    
+    The two lookups are independent, so they run concurrently and the
+    check takes as long as the slower one. A slow or failing Rentahuman
+    upstream costs at most UPSTREAM_DEADLINE and reads as unverified (or
+    its last good status), and the result is marked degraded.
+    """
+    (human, fetched), arp = await asyncio.gather(rentahuman_lookup.resolve(wallet), check_arp(wallet))
     
     trust_level, color, recommendation = calculate_combined_trust(human, arp)
     
@@ -113,9 +138,122 @@ async def check_combined_trust(wallet: str) -> CombinedTrust:
         arp_status=arp,
         trust_level=trust_level,
         color=color,
-        recommendation=recommendation
+        recommendation=recommendation,
+        degraded=not fetched
     )
 
+class TrustCache:
+    """
+    TTL cache of combined trust decisions with singleflight lookups.
+    
+    Concurrent get() calls for the same wallet share one upstream check,
+    so at most one check per wallet is in flight. Failed checks are cached
+    too (negative caching), for negative_ttl seconds, and re-raised to
+    callers until they expire; degraded decisions, made from fallback
+    data, are also kept only for negative_ttl.
+    """
+    
+    def __init__(
+        self,
+        check: Callable[[str], Awaitable[CombinedTrust]] = check_combined_trust,
+        ttl: float = TRUST_TTL,
+        negative_ttl: float = NEGATIVE_TTL,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.check = check
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        # wallet -> (expires_at, result, error); exactly one of result/error is set
+        self._entries: "OrderedDict[str, Tuple[float, Optional[CombinedTrust], Optional[Exception]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.degraded = 0  # Degraded decisions cached with negative_ttl
+    
+    async def get(self, wallet: str) -> CombinedTrust:
+        """Combined trust for wallet, from cache or a shared upstream check"""
+        entry = self._entries.get(wallet)
+        if entry is not None:
+            if entry[0] > self.clock():
+                self._entries.move_to_end(wallet)
+                if entry[2] is not None:
+                    self.negative_hits += 1
+                    raise entry[2]
+                self.hits += 1
+                return entry[1]
+            del self._entries[wallet]
+        task = self._inflight.get(wallet)
+        if task is None:
+            self.misses += 1
+            task = self._inflight[wallet] = asyncio.ensure_future(self._load(wallet))
+        else:
+            self.coalesced += 1
+        # Shielded so one caller being cancelled does not cancel the shared check
+        return await asyncio.shield(task)
+    
+    async def _load(self, wallet: str) -> CombinedTrust:
+        try:
+            result = await self.check(wallet)
+        except Exception as e:
+            self._store(wallet, self.negative_ttl, None, e)
+            raise
+        else:
+            if result.degraded:
+                self.degraded += 1
+            self._store(wallet, self.negative_ttl if result.degraded else self.ttl, result, None)
+            return result
+        finally:
+            del self._inflight[wallet]
+    
+    def _store(self, wallet: str, ttl: float, result: Optional[CombinedTrust], error: Optional[Exception]):
+        self._entries[wallet] = (self.clock() + ttl, result, error)
+        self._entries.move_to_end(wallet)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, wallet: Optional[str] = None):
+        """Drop one wallet's cached decision, or all of them"""
+        if wallet is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(wallet, None)
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.negative_hits + self.misses + self.coalesced
+        served = lookups - self.misses
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "degraded": self.degraded,
+            "hit_rate": round(served / lookups, 4) if lookups else 0.0
+        }
+
+async def check_combined_trust_many(
+    wallets: Iterable[str],
+    concurrency: int = MAX_CONCURRENT_CHECKS,
+    check: Callable[[str], Awaitable[CombinedTrust]] = check_combined_trust
+) -> List[CombinedTrust]:
+    """Check many wallets, at most `concurrency` in flight; results keep input order
+    
+    Pass check=TrustCache(...).get to serve repeated wallets from cache.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def bounded(wallet: str) -> CombinedTrust:
+        async with semaphore:
+            return await check(wallet)
+    
+    return await asyncio.gather(*(bounded(wallet) for wallet in wallets))
+
 async def demo():
     """Run demo with sample wallets"""
     print("=" * 60)
@@ -131,9 +269,10 @@ async def demo():
         "0x9999999999999999999999999999999999999999",  # Neither (suspicious)
     ]
     
-    for wallet in sample_wallets:
-        result = await check_combined_trust(wallet)
-        
+    cache = TrustCache()
+    results = await check_combined_trust_many(sample_wallets, check=cache.get)
+    
+    for wallet, result in zip(sample_wallets, results):
         print(f"Wallet: {wallet[:10]}...{wallet[-8:]}")
         print("-" * 50)
         print(f"  🤝 RENTAHUMAN:")
@@ -150,6 +289,11 @@ async def demo():
         print()
         print("=" * 60)
         print()
+    
+    # A gateway re-checks the same wallets constantly; the cache absorbs it
+    await check_combined_trust_many(sample_wallets * 25, check=cache.get)
+    print(f"Trust cache: {cache.stats()}")
+    print(f"Rentahuman lookups: {rentahuman_lookup.stats()}")
 
 def main():
     """Entry point"""
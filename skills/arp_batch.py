@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+ARP Batch Scoring
+
+Vectorized re-scoring of a whole agent population with NumPy, used after
+changing formula constants or score weights. Each function repeats the
+scalar Agent formula operation for operation, so batch and scalar results
+agree to float tolerance.
+
+NumPy is optional: HAS_NUMPY is False when it is not installed and the
+engines fall back to their scalar loops.
+"""
+
+from typing import Iterable, Sequence
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+def column(agents: Sequence, attr: str, dtype=None) -> "np.ndarray":
+    """One agent attribute as a NumPy array, in agent order"""
+    dtype = dtype or np.float64
+    return np.fromiter((getattr(a, attr) for a in agents), dtype=dtype, count=len(agents))
+
+def reputation_scores(
+    rating_sum: "np.ndarray",
+    rating_count: "np.ndarray",
+    stake: "np.ndarray",
+    tx_count: "np.ndarray",
+    rating_weight: float,
+    stake_weight: float,
+    tx_weight: float,
+    extra_terms: Iterable["np.ndarray"] = ()
+) -> "np.ndarray":
+    """
+    (avg_rating * rating_weight) + stake * stake_weight + tx_count * tx_weight
+    + each extra term, and 0.0 for agents with no ratings.
+    """
+    avg_rating = np.divide(
+        rating_sum, rating_count,
+        out=np.zeros(len(rating_sum), dtype=np.float64),
+        where=rating_count > 0
+    )
+    scores = (avg_rating * rating_weight) + (stake * stake_weight) + (tx_count * tx_weight)
+    for term in extra_terms:
+        scores = scores + term
+    return np.where(rating_count > 0, scores, 0.0)
+
+def ethos_scores(
+    wallet_age: "np.ndarray",
+    vouches: "np.ndarray",
+    positive_reviews: "np.ndarray",
+    negative_reviews: "np.ndarray",
+    slashes: "np.ndarray",
+    attestations: "np.ndarray",
+    credible_vouchers: "np.ndarray",
+    sybil_risk: "np.ndarray"
+) -> "np.ndarray":
+    """Ethos credibility, mirroring Agent.calculate_ethos_score (clamped at 0)"""
+    wallet_bonus = np.minimum(wallet_age * 10, 20)
+    vouch_bonus = np.minimum(vouches * 5, 25)
+    review_bonus = np.maximum(0, np.minimum((positive_reviews * 5) - (negative_reviews * 10), 25))
+    attestation_bonus = np.minimum(attestations * 3, 15)
+    voucher_bonus = np.minimum(credible_vouchers * 2, 10)
+    sybil_penalty = sybil_risk * 30
+    slash_penalty = slashes * 15
+    scores = (
+        50.0 +
+        wallet_bonus +
+        vouch_bonus +
+        review_bonus +
+        attestation_bonus +
+        voucher_bonus -
+        sybil_penalty -
+        slash_penalty
+    )
+    return np.maximum(scores, 0)
+
+def unified_scores(
+    arp_scores: "np.ndarray",
+    ethos: "np.ndarray",
+    arp_weight: float,
+    ethos_weight: float
+) -> "np.ndarray":
+    """Unified score, mirroring Agent.calculate_unified_score"""
+    arp_normalized = np.minimum(arp_scores / 2, 100)
+    return (arp_normalized * arp_weight) + (ethos * ethos_weight)
+
+def tier_codes(scores: "np.ndarray", bounds: Sequence[float]) -> "np.ndarray":
+    """Tier code per score: the number of tier bounds at or below it"""
+    return np.searchsorted(np.asarray(bounds, dtype=np.float64), scores, side="right").astype(np.int8)
+
+def max_drift(batch: Sequence[float], scalar: Sequence[float]) -> float:
+    """Largest absolute difference between batch and scalar results"""
+    return max((abs(b - s) for b, s in zip(batch, scalar)), default=0.0)
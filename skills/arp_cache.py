@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+ARP Agent Tiering
+
+AgentCache is a drop-in replacement for an engine's agents dict that keeps
+a bounded hot set in memory and pages cold agents out to a SQLite file:
+
+- hot set: LRU order, bounded by an approximate byte budget
+- cold store: compressed JSON agent state, faulted back in on access
+- membership, len() and iteration use an in-memory key index, so they
+  never touch disk
+
+Eviction is deferred while a hold() is open, so an engine can pin every
+agent an operation touches until the operation has finished mutating it.
+"""
+
+import json
+import sqlite3
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, MutableMapping, Tuple
+
+class AgentCache(MutableMapping):
+    """
+    Byte-budgeted LRU mapping with write-back to an on-disk cold store.
+
+    encode/decode convert a value to and from a JSON-able state dict;
+    size_of estimates the bytes a resident value holds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        byte_budget: int,
+        encode: Callable[[Any], Dict],
+        decode: Callable[[Dict], Any],
+        size_of: Callable[[Any], int]
+    ):
+        self.path = path
+        self.byte_budget = byte_budget
+        self.encode = encode
+        self.decode = decode
+        self.size_of = size_of
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS cold (key TEXT PRIMARY KEY, state BLOB NOT NULL)")
+        self._keys: Dict[str, None] = {}  # Every key, in insertion order
+        self._hot: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()  # key -> (value, size)
+        self._holds = 0
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._keys))
+
+    def __getitem__(self, key: str) -> Any:
+        entry = self._hot.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._hot.move_to_end(key)
+            # Values grow while resident (new ratings), so re-measure on use
+            value, size = entry
+            new_size = self.size_of(value)
+            self._hot[key] = (value, new_size)
+            self.resident_bytes += new_size - size
+            return value
+        if key not in self._keys:
+            raise KeyError(key)
+        self.misses += 1
+        row = self.conn.execute("SELECT state FROM cold WHERE key = ?", (key,)).fetchone()
+        value = self.decode(json.loads(zlib.decompress(row[0])))
+        self._admit(key, value)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self._keys[key] = None
+        self._admit(key, value)
+
+    def __delitem__(self, key: str):
+        del self._keys[key]
+        entry = self._hot.pop(key, None)
+        if entry is not None:
+            self.resident_bytes -= entry[1]
+        with self.conn:
+            self.conn.execute("DELETE FROM cold WHERE key = ?", (key,))
+
+    def _admit(self, key: str, value: Any):
+        entry = self._hot.pop(key, None)
+        if entry is not None:
+            self.resident_bytes -= entry[1]
+        size = self.size_of(value)
+        self._hot[key] = (value, size)
+        self.resident_bytes += size
+        self.trim()
+
+    def _pack(self, value: Any) -> bytes:
+        return zlib.compress(json.dumps(self.encode(value), separators=(",", ":")).encode(), 1)
+
+    def trim(self):
+        """Page least recently used values out until the hot set fits the budget"""
+        if self._holds:
+            return
+        evicted = []
+        while self.resident_bytes > self.byte_budget and len(self._hot) > 1:
+            key, (value, size) = self._hot.popitem(last=False)
+            self.resident_bytes -= size
+            evicted.append((key, self._pack(value)))
+        if evicted:
+            with self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO cold (key, state) VALUES (?, ?)", evicted)
+            self.evictions += len(evicted)
+
+    @contextmanager
+    def hold(self):
+        """Defer eviction until the outermost hold exits"""
+        self._holds += 1
+        try:
+            yield self
+        finally:
+            self._holds -= 1
+            if not self._holds:
+                self.trim()
+
+    def close(self):
+        self.conn.close()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "agents": len(self._keys),
+            "resident": len(self._hot),
+            "resident_bytes": self.resident_bytes,
+            "byte_budget": self.byte_budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -9,14 +9,19 @@ Trust scores enable agent-to-agent commerce.
 
 import json
 import random
+import sys
 import time
-import uuid
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Tuple
 from enum import Enum
 from collections import defaultdict
 
+from arp_export import FORMATS, export_records
+from arp_ids import IdGenerator, RandomIds, now_ns
+from arp_ratings import RatingStore, RetentionPolicy, valid_rating
+from arp_storage import SQLiteStorage
+
 class AttestationType(Enum):
     COMPLETED = "completed"
     PARTIAL = "partial"
@@ -30,37 +35,70 @@ class ReputationTier(Enum):
     ELITE = (100, 200, "🌟")
     LEGENDARY = (200, float('inf'), "👑")
 
-@dataclass
+# Tier boundary table: a score's tier code is the number of bounds at or
+# below it, found by binary search; labels are only rendered on output
+TIER_BOUNDS = [tier.value[0] for tier in list(ReputationTier)[1:]]
+TIER_LABELS = [f"{tier.value[2]} {tier.name}" for tier in ReputationTier]
+
+@dataclass(slots=True)
 class Agent:
     """An agent in the reputation system"""
     name: str
     address: str
+    agent_id: int = -1  # Dense integer id assigned at registration
     staked_usdc: float = 0.0
     transactions_count: int = 0
-    ratings: List[Dict] = field(default_factory=list)
+    ratings: RatingStore = field(default_factory=RatingStore)
     reputation_score: float = 0.0
-    reputation_tier: str = "🆕 NEWCOMER"
+    tier_code: int = 0  # Index into TIER_LABELS
+    rating_sum: int = 0  # Running aggregates so scoring is O(1) per update
+    rating_count: int = 0
+    
+    def add_rating(self, rating: int, tx_hash: str, feedback: str = "", at: Optional[float] = None):
+        """Record a rating and update the running aggregates"""
+        self.ratings.add(rating, tx_hash, feedback, at)
+        self.rating_sum += rating
+        self.rating_count += 1
+    
+    def verify_reputation(self) -> Dict:
+        """Recompute rating aggregates from scratch, report drift and resync them
+        
+        The score is left alone; ARPContract.verify_reputation rescores it.
+        """
+        expected_sum = self.ratings.total()
+        expected_count = self.ratings.count()
+        ok = expected_sum == self.rating_sum and expected_count == self.rating_count
+        result = {
+            "ok": ok,
+            "rating_sum": self.rating_sum,
+            "rating_count": self.rating_count,
+            "expected_sum": expected_sum,
+            "expected_count": expected_count
+        }
+        if not ok:
+            self.rating_sum = expected_sum
+            self.rating_count = expected_count
+        return result
     
     def calculate_reputation(self):
         """Calculate reputation score"""
-        if not self.ratings:
+        if not self.rating_count:
             self.reputation_score = 0.0
         else:
-            avg_rating = sum(r["rating"] for r in self.ratings) / len(self.ratings)
+            avg_rating = self.rating_sum / self.rating_count
             stake_bonus = self.staked_usdc * 0.1
             tx_bonus = self.transactions_count * 2
             
             self.reputation_score = (avg_rating * 20) + stake_bonus + tx_bonus
         
-        # Determine tier
-        for tier in ReputationTier:
-            min_score, max_score, emoji = tier.value
-            if min_score <= self.reputation_score < max_score:
-                self.reputation_tier = f"{emoji} {tier.name}"
-                break
-        
+        self.tier_code = bisect_right(TIER_BOUNDS, self.reputation_score)
         return self.reputation_score
     
+    @property
+    def reputation_tier(self) -> str:
+        """Tier label, rendered from the tier code on read"""
+        return TIER_LABELS[self.tier_code]
+    
     def to_dict(self):
         return {
             "name": self.name,
@@ -69,39 +107,74 @@ class Agent:
             "reputation_score": round(self.reputation_score, 1),
             "reputation_tier": self.reputation_tier,
             "transactions": self.transactions_count,
-            "ratings_count": len(self.ratings)
+            "ratings_count": self.rating_count
         }
 
 class ARPContract:
     """Simulated ARP smart contract"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        storage: Optional[SQLiteStorage] = None,
+        rating_retention: Optional[RetentionPolicy] = None,
+        ids: Optional[IdGenerator] = None
+    ):
         self.agents: Dict[str, Agent] = {}
-        self.transactions: List[Dict] = []
+        self.agent_ids: List[str] = []  # agent_id -> address
+        self.transactions: Dict[str, Dict] = {}  # tx_hash -> tx, in submission order
         self.attestations: List[Dict] = []
-        
+        self.storage = storage  # Optional queryable history store (see arp_storage)
+        self.rating_retention = rating_retention  # Applied to every agent's RatingStore
+        self.ids = ids or RandomIds()  # Source of addresses and tx hashes (see arp_ids)
+        
+    def _store(
+        self,
+        addresses: Iterable[str] = (),
+        txs: Iterable[Dict] = (),
+        attestations: Iterable[Dict] = ()
+    ):
+        """Mirror changed agents, transactions and ratings into storage"""
+        if self.storage is None:
+            return
+        for tx in txs:
+            self.storage.save_transaction(tx)
+        for attestation in attestations:
+            self.storage.save_transaction(self.transactions[attestation["tx_hash"]], attested_at=attestation["timestamp"])
+            # The rating lands on the transaction's sender, given by its counterparty
+            self.storage.save_rating(
+                attestation["tx_hash"], attestation["to"], attestation["from"],
+                attestation["rating"], attestation["feedback"], attestation["timestamp"]
+            )
+        for addr in addresses:
+            if addr in self.agents:
+                self.storage.save_agent(self.agents[addr])
+    
     def register_agent(self, name: str, staked_usdc: float = 10.0) -> Agent:
         """Register a new agent"""
         agent = Agent(
             name=name,
-            address=f"0x{uuid.uuid4().hex[:40]}",
-            staked_usdc=staked_usdc
+            address=sys.intern(self.ids.tx_hash()),
+            agent_id=len(self.agent_ids),
+            staked_usdc=staked_usdc,
+            ratings=RatingStore(retention=self.rating_retention)
         )
+        self.agent_ids.append(agent.address)
         agent.calculate_reputation()
         self.agents[agent.address] = agent
+        self._store([agent.address])
         return agent
     
     def submit_transaction(self, from_addr: str, to_addr: str, amount: float) -> Dict:
         """Record a transaction"""
         tx = {
-            "tx_hash": f"0x{uuid.uuid4().hex[:40]}",
+            "tx_hash": self.ids.tx_hash(),
             "from": from_addr,
             "to": to_addr,
             "amount": amount,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_ns(),
             "status": "pending"
         }
-        self.transactions.append(tx)
+        self.transactions[tx["tx_hash"]] = tx
         
         # Update agent transaction counts
         if from_addr in self.agents:
@@ -109,14 +182,19 @@ class ARPContract:
         if to_addr in self.agents:
             self.agents[to_addr].transactions_count += 1
         
+        self._store([from_addr, to_addr], [tx])
         return tx
     
     def attest(self, tx_hash: str, rating: int, feedback: str = "") -> Dict:
         """Submit rating for a transaction"""
         # Find transaction
-        tx = next((t for t in self.transactions if t["tx_hash"] == tx_hash), None)
+        tx = self.transactions.get(tx_hash)
         if not tx:
             return {"error": "Transaction not found"}
+        if tx["status"] == "completed":
+            return {"error": "Transaction already attested"}
+        if not valid_rating(rating):
+            return {"error": "Rating out of range"}
         
         # Update transaction status
         tx["status"] = "completed"
@@ -128,25 +206,103 @@ class ARPContract:
             "to": tx["to"],
             "rating": rating,
             "feedback": feedback,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_ns()
         }
         self.attestations.append(attestation)
         
         # Update agent ratings
         if tx["from"] in self.agents:
-            self.agents[tx["from"]].ratings.append({
-                "rating": rating,
-                "tx_hash": tx_hash,
-                "feedback": feedback
-            })
+            self.agents[tx["from"]].add_rating(rating, tx_hash, feedback)
         
         # Recalculate reputations
         for addr in [tx["from"], tx["to"]]:
             if addr in self.agents:
                 self.agents[addr].calculate_reputation()
         
+        self._store([tx["from"], tx["to"]], attestations=[attestation])
         return attestation
     
+    def submit_transactions_batch(self, events: Iterable[Tuple[str, str, float]]) -> List[Dict]:
+        """Record many transactions at once
+        
+        events are (from_addr, to_addr, amount) tuples. The batch shares one
+        timestamp and one draw for its hashes, and each agent's
+        transaction count is bumped once.
+        """
+        events = list(events)
+        timestamp = now_ns()
+        hashes = self.ids.tx_hashes(len(events))
+        tx_counts = defaultdict(int)
+        txs = []
+        for i, (from_addr, to_addr, amount) in enumerate(events):
+            tx = {
+                "tx_hash": hashes[i],
+                "from": from_addr,
+                "to": to_addr,
+                "amount": amount,
+                "timestamp": timestamp,
+                "status": "pending"
+            }
+            self.transactions[tx["tx_hash"]] = tx
+            txs.append(tx)
+            tx_counts[from_addr] += 1
+            tx_counts[to_addr] += 1
+        
+        for addr, count in tx_counts.items():
+            if addr in self.agents:
+                self.agents[addr].transactions_count += count
+        
+        self._store(tx_counts, txs)
+        return txs
+    
+    def attest_batch(self, attestations: Iterable[Tuple]) -> List[Dict]:
+        """Submit many ratings at once
+        
+        attestations are (tx_hash, rating) or (tx_hash, rating, feedback)
+        tuples. Each touched agent is rescored once after the whole batch;
+        unknown or already-attested transactions get an error entry in the
+        results.
+        """
+        timestamp = now_ns()
+        touched: Dict[str, None] = {}  # Insertion-ordered set
+        results = []
+        for tx_hash, rating, *rest in attestations:
+            feedback = rest[0] if rest else ""
+            tx = self.transactions.get(tx_hash)
+            if not tx:
+                results.append({"error": "Transaction not found", "tx_hash": tx_hash})
+                continue
+            if tx["status"] == "completed":
+                results.append({"error": "Transaction already attested", "tx_hash": tx_hash})
+                continue
+            if not valid_rating(rating):
+                results.append({"error": "Rating out of range", "tx_hash": tx_hash})
+                continue
+            
+            tx["status"] = "completed"
+            attestation = {
+                "tx_hash": tx_hash,
+                "from": tx["from"],
+                "to": tx["to"],
+                "rating": rating,
+                "feedback": feedback,
+                "timestamp": timestamp
+            }
+            self.attestations.append(attestation)
+            results.append(attestation)
+            
+            if tx["from"] in self.agents:
+                self.agents[tx["from"]].add_rating(rating, tx_hash, feedback)
+            touched[tx["from"]] = None
+            touched[tx["to"]] = None
+        
+        for addr in touched:
+            if addr in self.agents:
+                self.agents[addr].calculate_reputation()
+        
+        self._store(touched, attestations=[r for r in results if "error" not in r])
+        return results
+    
     def slash_agent(self, address: str, reason: str) -> Dict:
         """Slash stake for bad behavior"""
         if address not in self.agents:
@@ -155,12 +311,9 @@ class ARPContract:
         agent = self.agents[address]
         slash_amount = agent.staked_usdc * 0.5
         agent.staked_usdc -= slash_amount
-        agent.ratings.append({
-            "rating": 1,
-            "tx_hash": "SLASH",
-            "feedback": f"Slashed for: {reason}"
-        })
+        agent.add_rating(1, "SLASH", f"Slashed for: {reason}")
         agent.calculate_reputation()
+        self._store([address])
         
         return {
             "agent": agent.name,
@@ -169,11 +322,48 @@ class ARPContract:
             "reason": reason
         }
     
+    def verify_reputation(self, address: str) -> Dict:
+        """Check an agent's rating aggregates and rescore it if they had drifted"""
+        if address not in self.agents:
+            return {"error": "Agent not found"}
+        
+        agent = self.agents[address]
+        result = agent.verify_reputation()
+        if not result["ok"]:
+            agent.calculate_reputation()
+            self._store([address])
+        return result
+    
     def get_agent(self, address: str) -> Optional[Agent]:
         return self.agents.get(address)
     
+    def get_agent_by_id(self, agent_id: int) -> Optional[Agent]:
+        if not 0 <= agent_id < len(self.agent_ids):
+            return None
+        return self.agents.get(self.agent_ids[agent_id])
+    
     def get_all_agents(self) -> List[Dict]:
-        return [a.to_dict() for a in self.agents.values()]
+        return list(self.iter_agents())
+    
+    def iter_agents(self) -> Iterator[Dict]:
+        """Agent dicts one at a time, in registration order"""
+        for agent in self.agents.values():
+            yield agent.to_dict()
+    
+    def export(self, kind: str, target: Any, fmt: str = "jsonl", chunk_size: int = 1000) -> Dict:
+        """Stream agents, transactions or attestations to a binary file or
+        socket (see arp_export); fmt is "jsonl" or "json"
+        """
+        sources = {
+            "agents": lambda: (dict(a.to_dict(), address=a.address) for a in self.agents.values()),
+            "transactions": lambda: iter(self.transactions.values()),
+            "attestations": lambda: iter(self.attestations),
+        }
+        if kind not in sources:
+            return {"error": f"Unknown export: {kind}"}
+        if fmt not in FORMATS:
+            return {"error": f"Unknown format: {fmt}"}
+        return {"kind": kind, "exported": export_records(sources[kind](), target, fmt, chunk_size)}
 
 class ARPDemo:
     """Demonstrate ARP in action"""
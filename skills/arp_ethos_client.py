@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+ARP Ethos HTTP Client
+
+Async client for the Ethos credibility API, standard library only:
+
+- keep-alive HTTP/1.1 connections, pooled and reused across requests
+- batched multi-address lookups (POST /profiles) split into batch_size
+  chunks that are fetched concurrently
+- a timeout per attempt, and retries with jittered exponential backoff on
+  connection errors, timeouts, 429 and 5xx responses
+
+EthosStandInServer answers the same endpoints with the same profile shape
+and configurable latency and error injection, so the client can be
+load-tested offline:
+
+    python arp_ethos_client.py [requests] [concurrency] [latency_ms]
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import ssl
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+def default_profile(address: str) -> Dict:
+    """Profile Ethos reports for an address it knows nothing about"""
+    return {
+        "address": address,
+        "credibility_score": 50.0,  # Default
+        "wallet_age": 0,
+        "vouches": 0,
+        "reviews": {"positive": 0, "negative": 0},
+        "slashes": 0,
+        "sybil_risk": 0.5,  # Unknown = medium risk
+        "attestations": 0,
+        "credible_vouchers": 0
+    }
+
+class EthosAPIError(Exception):
+    """Non-retryable error response, or retries exhausted"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed mid-headers")
+        if line in (b"\r\n", b"\n"):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = bytearray()
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if not size:
+                await _read_headers(reader)  # Trailers
+                return bytes(body)
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+    return await reader.readexactly(int(headers.get("content-length", 0)))
+
+def _keep_alive(headers: Dict[str, str]) -> bool:
+    return headers.get("connection", "").lower() != "close"
+
+class EthosClient:
+    """
+    Pooled async client for one Ethos API base URL.
+
+    At most pool_size connections are open at once; idle ones are kept for
+    reuse until close(). timeout bounds each attempt, not the whole call.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = 8,
+        timeout: float = 5.0,
+        retries: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        batch_size: int = 100
+    ):
+        parts = urlsplit(base_url)
+        self.base_url = base_url
+        self.host = parts.hostname
+        self.tls = parts.scheme == "https"
+        self.port = parts.port or (443 if self.tls else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.batch_size = batch_size
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(pool_size)
+        self.requests = 0
+        self.retried = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+
+    async def __aenter__(self) -> "EthosClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def get_profile(self, address: str) -> Dict:
+        """Ethos profile for one address"""
+        return await self._request("GET", f"{self.prefix}/profile/{quote(address)}")
+
+    async def get_profiles(self, addresses: Iterable[str]) -> Dict[str, Dict]:
+        """Ethos profiles for many addresses, batch_size per request, batches in parallel"""
+        addresses = list(dict.fromkeys(addresses))
+        batches = [addresses[i:i + self.batch_size] for i in range(0, len(addresses), self.batch_size)]
+        responses = await asyncio.gather(*(
+            self._request("POST", f"{self.prefix}/profiles", {"addresses": batch}) for batch in batches
+        ))
+        return {profile["address"]: profile for response in responses for profile in response["profiles"]}
+
+    async def _request(self, method: str, path: str, payload: Any = None) -> Any:
+        body = json.dumps(payload, separators=(",", ":")).encode() if payload is not None else b""
+        attempt = 0
+        while True:
+            self.requests += 1
+            try:
+                status, data = await asyncio.wait_for(self._send(method, path, body), self.timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                error = EthosAPIError(f"{method} {path} failed: {e!r}")
+            else:
+                if status < 300:
+                    return json.loads(data)
+                error = EthosAPIError(f"{method} {path} returned {status}", status)
+                if status not in RETRY_STATUSES:
+                    raise error
+            if attempt >= self.retries:
+                raise error
+            # Full jitter: spreads retries from many callers across the window
+            await asyncio.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+            attempt += 1
+            self.retried += 1
+
+    async def _send(self, method: str, path: str, body: bytes) -> Tuple[int, bytes]:
+        async with self._slots:
+            if self._idle:
+                reader, writer = self._idle.pop()
+                self.connections_reused += 1
+            else:
+                reader, writer = await asyncio.open_connection(
+                    self.host, self.port, ssl=ssl.create_default_context() if self.tls else None
+                )
+                self.connections_opened += 1
+            reusable = False
+            try:
+                writer.write(
+                    f"{method} {path} HTTP/1.1\r\n"
+                    f"Host: {self.host}\r\n"
+                    "Connection: keep-alive\r\n"
+                    "Accept: application/json\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                status_line = await reader.readline()
+                if not status_line:
+                    raise ConnectionError("Connection closed by server")
+                status = int(status_line.split()[1])
+                headers = await _read_headers(reader)
+                data = await _read_body(reader, headers)
+                reusable = _keep_alive(headers)
+                return status, data
+            finally:
+                # A timeout or error leaves the connection mid-response; drop it
+                if reusable:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "retried": self.retried,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "idle_connections": len(self._idle)
+        }
+
+def synthetic_profile(address: str) -> Dict:
+    """Deterministic made-up profile, so stand-in data varies by address"""
+    seed = hashlib.blake2b(address.encode(), digest_size=8).digest()
+    profile = default_profile(address)
+    profile.update({
+        "credibility_score": round(20 + seed[0] / 255 * 80, 1),
+        "wallet_age": round(seed[1] / 51, 1),
+        "vouches": seed[2] % 10,
+        "reviews": {"positive": seed[3] % 20, "negative": seed[4] % 3},
+        "slashes": int(seed[5] < 16),
+        "sybil_risk": round(seed[6] / 255, 2),
+        "attestations": seed[7] % 8,
+        "credible_vouchers": seed[2] % 5
+    })
+    return profile
+
+class EthosStandInServer:
+    """
+    Local HTTP server with the Ethos client's endpoints:
+
+        GET  {prefix}/profile/<address>
+        POST {prefix}/profiles   {"addresses": [...]} -> {"profiles": [...]}
+
+    lookup returns a profile or None (None serves default_profile). Each
+    request waits latency plus up to jitter seconds; error_rate is the
+    fraction answered 503 instead.
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[str], Optional[Dict]] = synthetic_profile,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        prefix: str = "/v1"
+    ):
+        self.lookup = lookup
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.host = host
+        self.port = port
+        self.prefix = prefix.rstrip("/")
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.requests = 0
+        self.connections = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}{self.prefix}"
+
+    async def start(self) -> str:
+        """Start listening; returns the base URL to hand to EthosClient"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.base_url
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "EthosStandInServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _profile(self, address: str) -> Dict:
+        return self.lookup(address) or default_profile(address)
+
+    def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        if not path.startswith(self.prefix + "/"):
+            return 404, {"error": "Not found"}
+        path = path[len(self.prefix):]
+        if method == "GET" and path.startswith("/profile/"):
+            return 200, self._profile(unquote(path[len("/profile/"):]))
+        if method == "POST" and path == "/profiles":
+            try:
+                addresses = json.loads(body)["addresses"]
+            except (ValueError, KeyError, TypeError):
+                return 400, {"error": "Expected {\"addresses\": [...]}"}
+            return 200, {"profiles": [self._profile(address) for address in addresses]}
+        return 404, {"error": "Not found"}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = await _read_headers(reader)
+                body = await _read_body(reader, headers)
+                self.requests += 1
+                delay = self.latency + random.uniform(0, self.jitter)
+                if delay:
+                    await asyncio.sleep(delay)
+                if random.random() < self.error_rate:
+                    status, payload = 503, {"error": "Injected failure"}
+                else:
+                    status, payload = self._route(method, path, body)
+                data = json.dumps(payload, separators=(",", ":")).encode()
+                keep_alive = _keep_alive(headers)
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def load_test(requests: int = 2000, concurrency: int = 64, latency: float = 0.005) -> Dict:
+    """Single-address lookups against a stand-in server; returns throughput and client stats"""
+    async with EthosStandInServer(latency=latency, jitter=latency) as server:
+        async with EthosClient(server.base_url, pool_size=concurrency) as client:
+            addresses = [f"0x{i:040x}" for i in range(requests)]
+            start = time.perf_counter()
+            await asyncio.gather(*(client.get_profile(address) for address in addresses))
+            single = time.perf_counter() - start
+            start = time.perf_counter()
+            await client.get_profiles(addresses)
+            batched = time.perf_counter() - start
+            return {
+                "requests": requests,
+                "single_per_sec": round(requests / single),
+                "batched_per_sec": round(requests / batched),
+                "client": client.stats(),
+                "server_connections": server.connections
+            }
+
+def main():
+    import sys
+    args = [float(arg) for arg in sys.argv[1:4]]
+    requests = int(args[0]) if args else 2000
+    concurrency = int(args[1]) if len(args) > 1 else 64
+    latency = args[2] / 1000 if len(args) > 2 else 0.005
+    print(json.dumps(asyncio.run(load_test(requests, concurrency, latency)), indent=2))
+
+if __name__ == "__main__":
+    main()
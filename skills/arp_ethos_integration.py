@@ -13,14 +13,22 @@ Features:
 """
 
 import json
-import uuid
+import sys
 import time
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Tuple
 from enum import Enum
 from collections import defaultdict
 
+import arp_batch
+from arp_ethos_client import EthosClient, default_profile
+from arp_export import FORMATS, PayloadCache, export_records
+from arp_index import LeaderboardIndex
+from arp_ids import IdGenerator, RandomIds, now_ns
+from arp_ratings import RatingStore, RetentionPolicy, valid_rating
+from arp_resilience import ResilientLookup
+
 # Ethos-style constants
 ETHOS_API_BASE = "https://api.ethos.network/v1"
 ETHEREUM_MAINNET = 1
@@ -49,20 +57,52 @@ class ReputationTier(Enum):
     ELITE = (100, 200, "🌟")
     LEGENDARY = (200, float('inf'), "👑")
 
-@dataclass
+# Tier boundary table: a score's tier code is the number of bounds at or
+# below it, found by binary search; labels are only rendered on output
+TIER_BOUNDS = [tier.value[0] for tier in list(ReputationTier)[1:]]
+TIER_LABELS = [f"{tier.value[2]} {tier.name}" for tier in ReputationTier]
+
+# Unified scores use their own boundaries over the same tier labels
+UNIFIED_TIER_BOUNDS = [25, 50, 75, 90]
+
+# ARP formula weights and unified-score blend, shared by the Agent score
+# methods and ARPxEthosIntegration.rescore_all
+RATING_WEIGHT = 20
+STAKE_WEIGHT = 0.1
+TX_WEIGHT = 2
+ARP_WEIGHT = 0.5
+ETHOS_WEIGHT = 0.5
+
+# Ethos profile keys (as returned by query_ethos_api / the Ethos API) ->
+# Agent attributes; "reviews" is nested as {"positive", "negative"}
+ETHOS_PROFILE_FIELDS = {
+    "wallet_age": "ethos_wallet_age",
+    "vouches": "ethos_vouches",
+    "positive_reviews": "ethos_positive_reviews",
+    "negative_reviews": "ethos_negative_reviews",
+    "slashes": "ethos_slashes",
+    "attestations": "ethos_attestations",
+    "credible_vouchers": "ethos_credible_vouchers",
+    "sybil_risk": "ethos_sybil_risk",
+}
+
+@dataclass(slots=True)
 class Agent:
     """Unified agent with ARP + Ethos scores"""
     name: str
     address: str
+    agent_id: int = -1  # Dense integer id assigned at registration
     eth_address: Optional[str] = None  # For Ethos lookup
     
     # ARP scores
     arp_stake: float = 0.0
     arp_delegated: float = 0.0
     arp_tx_count: int = 0
-    arp_ratings: List[Dict] = field(default_factory=list)
+    arp_ratings: RatingStore = field(default_factory=RatingStore)
     arp_score: float = 0.0
-    arp_tier: str = "🆕 NEWCOMER"
+    arp_tier_code: int = 0  # Index into TIER_LABELS
+    arp_rating_sum: int = 0  # Running aggregates so scoring is O(1) per update
+    arp_rating_count: int = 0
     
     # Ethos scores (simulated - would query API in production)
     ethos_wallet_age: float = 0.0  # Years
@@ -74,30 +114,78 @@ class Agent:
     ethos_credible_vouchers: int = 0
     ethos_sybil_risk: float = 0.0  # 0-1 scale
     ethos_credibility_score: float = 0.0
+    ethos_stale: bool = True  # Set by update_ethos; the credibility score is cached until then
     
     # Combined
     unified_score: float = 0.0
-    unified_tier: str = "🆕"
+    unified_tier_code: int = 0  # Index into TIER_LABELS, by UNIFIED_TIER_BOUNDS
+    
+    def add_arp_rating(self, rating: int, tx_hash: str, feedback: str = "", at: Optional[float] = None):
+        """Record an ARP rating and update the running aggregates"""
+        self.arp_ratings.add(rating, tx_hash, feedback, at)
+        self.arp_rating_sum += rating
+        self.arp_rating_count += 1
+    
+    def verify_arp_score(self) -> Dict:
+        """Recompute ARP rating aggregates from scratch, report drift and resync them
+        
+        The scores are left alone; ARPxEthosIntegration.verify_arp_score rescores them.
+        """
+        expected_sum = self.arp_ratings.total()
+        expected_count = self.arp_ratings.count()
+        ok = expected_sum == self.arp_rating_sum and expected_count == self.arp_rating_count
+        result = {
+            "ok": ok,
+            "rating_sum": self.arp_rating_sum,
+            "rating_count": self.arp_rating_count,
+            "expected_sum": expected_sum,
+            "expected_count": expected_count
+        }
+        if not ok:
+            self.arp_rating_sum = expected_sum
+            self.arp_rating_count = expected_count
+        return result
     
     def calculate_arp_score(self):
         """Calculate ARP reputation score"""
-        if not self.arp_ratings:
+        if not self.arp_rating_count:
             self.arp_score = 0.0
         else:
-            avg_rating = sum(r["rating"] for r in self.arp_ratings) / len(self.arp_ratings)
-            stake_bonus = (self.arp_stake + self.arp_delegated) * 0.1
-            tx_bonus = self.arp_tx_count * 2
+            avg_rating = self.arp_rating_sum / self.arp_rating_count
+            stake_bonus = (self.arp_stake + self.arp_delegated) * STAKE_WEIGHT
+            tx_bonus = self.arp_tx_count * TX_WEIGHT
             
-            self.arp_score = (avg_rating * 20) + stake_bonus + tx_bonus
-        
-        for tier in ReputationTier:
-            min_score, max_score, emoji = tier.value
-            if min_score <= self.arp_score < max_score:
-                self.arp_tier = f"{emoji} {tier.name}"
-                break
+            self.arp_score = (avg_rating * RATING_WEIGHT) + stake_bonus + tx_bonus
         
+        self.arp_tier_code = bisect_right(TIER_BOUNDS, self.arp_score)
         return self.arp_score
     
+    @property
+    def arp_tier(self) -> str:
+        """ARP tier label, rendered from the tier code on read"""
+        return TIER_LABELS[self.arp_tier_code]
+    
+    def update_ethos(self, profile: Dict) -> bool:
+        """Apply Ethos profile fields (see ETHOS_PROFILE_FIELDS); returns whether any changed
+        
+        Unrecognised keys, such as "address" and "credibility_score", are ignored.
+        """
+        fields = dict(profile)
+        reviews = fields.pop("reviews", None) or {}
+        if "positive" in reviews:
+            fields["positive_reviews"] = reviews["positive"]
+        if "negative" in reviews:
+            fields["negative_reviews"] = reviews["negative"]
+        changed = False
+        for key, value in fields.items():
+            attr = ETHOS_PROFILE_FIELDS.get(key)
+            if attr is not None and getattr(self, attr) != value:
+                setattr(self, attr, value)
+                changed = True
+        if changed:
+            self.ethos_stale = True
+        return changed
+    
     def calculate_ethos_score(self):
         """Calculate Ethos credibility score (simulated)"""
         # In production, this would query Ethos API
@@ -127,7 +215,7 @@ class Agent:
         # Slash penalty
         slash_penalty = self.ethos_slashes * 15
         
-        self.ethos_credibility_score = (
+        self.ethos_credibility_score = max(0, (
             base_score +
             wallet_bonus +
             vouch_bonus +
@@ -136,35 +224,37 @@ class Agent:
             voucher_bonus -
             sybil_penalty -
             slash_penalty
-        )
+        ))
+        self.ethos_stale = False
         
-        return max(0, self.ethos_credibility_score)
+        return self.ethos_credibility_score
     
-    def calculate_unified_score(self, arp_weight: float = 0.5, ethos_weight: float = 0.5):
-        """Calculate unified trust score"""
+    def calculate_unified_score(self, arp_weight: Optional[float] = None, ethos_weight: Optional[float] = None):
+        """Calculate unified trust score (weights default to ARP_WEIGHT/ETHOS_WEIGHT)
+        
+        The Ethos component is recomputed only when an Ethos field has
+        changed since the last calculation (see update_ethos).
+        """
+        arp_weight = ARP_WEIGHT if arp_weight is None else arp_weight
+        ethos_weight = ETHOS_WEIGHT if ethos_weight is None else ethos_weight
         self.arp_score = self.calculate_arp_score()
-        self.ethos_credibility_score = self.calculate_ethos_score()
+        if self.ethos_stale:
+            self.calculate_ethos_score()
         
         # Normalize scores to 0-100 scale
         arp_normalized = min(self.arp_score / 2, 100)  # ARP usually 0-200
         ethos_normalized = self.ethos_credibility_score  # Already ~0-100
         
         self.unified_score = (arp_normalized * arp_weight) + (ethos_normalized * ethos_weight)
-        
-        # Determine unified tier
-        if self.unified_score >= 90:
-            self.unified_tier = "👑 LEGENDARY"
-        elif self.unified_score >= 75:
-            self.unified_tier = "🌟 ELITE"
-        elif self.unified_score >= 50:
-            self.unified_tier = "🏅 ESTABLISHED"
-        elif self.unified_score >= 25:
-            self.unified_tier = "✅ TRUSTED"
-        else:
-            self.unified_tier = "🆕 NEWCOMER"
+        self.unified_tier_code = bisect_right(UNIFIED_TIER_BOUNDS, self.unified_score)
         
         return self.unified_score
     
+    @property
+    def unified_tier(self) -> str:
+        """Unified tier label, rendered from the tier code on read"""
+        return TIER_LABELS[self.unified_tier_code]
+    
     def to_dict(self, include_all: bool = False):
         """Export agent data"""
         base = {
@@ -182,7 +272,7 @@ class Agent:
                 "arp_stake": self.arp_stake,
                 "arp_delegated": self.arp_delegated,
                 "arp_tx_count": self.arp_tx_count,
-                "arp_ratings_count": len(self.arp_ratings),
+                "arp_ratings_count": self.arp_rating_count,
                 "ethos_wallet_age": self.ethos_wallet_age,
                 "ethos_vouches": self.ethos_vouches,
                 "ethos_positive_reviews": self.ethos_positive_reviews,
@@ -207,13 +297,55 @@ class ARPxEthosIntegration:
     4. Calculate unified trust scores
     """
     
-    def __init__(self, name: str = "ARPxEthos"):
+    def __init__(
+        self,
+        name: str = "ARPxEthos",
+        rating_retention: Optional[RetentionPolicy] = None,
+        ids: Optional[IdGenerator] = None,
+        ethos_client: Optional[EthosClient] = None
+    ):
         self.name = name
+        self.ethos_client = ethos_client  # Live Ethos API; None = simulate from local agents
+        # Hedged, circuit-broken access to the live API, falling back to default profiles
+        self.ethos_lookup = ResilientLookup(
+            ethos_client.get_profile, default_profile, fetch_many=ethos_client.get_profiles
+        ) if ethos_client is not None else None
+        self.rating_retention = rating_retention  # Applied to every agent's RatingStore
+        self.ids = ids or RandomIds()  # Source of tx hashes (see arp_ids)
         self.agents: Dict[str, Agent] = {}
-        self.transactions: List[Dict] = []
+        self.agent_ids: List[str] = []  # agent_id -> address
+        self.transactions: Dict[str, Dict] = {}  # tx_hash -> tx, in submission order
         self.attestations: List[Dict] = []
         self.shared_slashing_events: List[Dict] = []
+        # One order-statistics index per sortable score, kept in sync by _rescore
+        self.leaderboards: Dict[str, LeaderboardIndex] = {
+            "unified_score": LeaderboardIndex(),
+            "arp_score": LeaderboardIndex(),
+            "ethos_score": LeaderboardIndex(),
+        }
+        self.leaderboard_version = 0  # Bumped on every score change
+        self.leaderboard_pages = PayloadCache()  # Encoded pages, valid for one version
+        # eth_address -> agent address; a miss is one dict probe
+        self.eth_index: Dict[str, str] = {}
         
+    def _rescore(self, agent: Agent) -> float:
+        """Recalculate an agent's unified score and refresh the leaderboards"""
+        agent.calculate_unified_score()
+        self.leaderboards["unified_score"].update(agent.address, agent.unified_score)
+        self.leaderboards["arp_score"].update(agent.address, agent.arp_score)
+        self.leaderboards["ethos_score"].update(agent.address, agent.ethos_credibility_score)
+        self.leaderboard_version += 1
+        return agent.unified_score
+    
+    def _index_eth_address(self, agent: Agent):
+        """Point the agent's eth_address at it in the Ethos lookup index"""
+        previous = self.agents.get(agent.address)
+        if previous and previous.eth_address and self.eth_index.get(previous.eth_address) == agent.address:
+            del self.eth_index[previous.eth_address]
+        if not agent.eth_address:
+            return
+        self.eth_index[agent.eth_address] = agent.address
+    
     def register_agent(
         self, 
         name: str, 
@@ -230,9 +362,16 @@ class ARPxEthosIntegration:
         ethos_sybil_risk: float = 0.1
     ) -> Agent:
         """Register a new agent with ARP + Ethos data"""
+        address = sys.intern(address)
+        if address in self.agents:
+            agent_id = self.agents[address].agent_id
+        else:
+            agent_id = len(self.agent_ids)
+            self.agent_ids.append(address)
         agent = Agent(
             name=name,
             address=address,
+            agent_id=agent_id,
             eth_address=eth_address,
             arp_stake=arp_stake,
             ethos_wallet_age=ethos_wallet_age,
@@ -242,25 +381,27 @@ class ARPxEthosIntegration:
             ethos_slashes=ethos_slashes,
             ethos_attestations=ethos_attestations,
             ethos_credible_vouchers=ethos_credible_vouchers,
-            ethos_sybil_risk=ethos_sybil_risk
+            ethos_sybil_risk=ethos_sybil_risk,
+            arp_ratings=RatingStore(retention=self.rating_retention)
         )
         
-        agent.calculate_unified_score()
+        self._index_eth_address(agent)
         self.agents[address] = agent
+        self._rescore(agent)
         
         return agent
     
     def submit_transaction(self, from_addr: str, to_addr: str, amount: float) -> Dict:
         """Record a transaction between agents"""
         tx = {
-            "tx_hash": f"0x{uuid.uuid4().hex[:40]}",
+            "tx_hash": self.ids.tx_hash(),
             "from": from_addr,
             "to": to_addr,
             "amount": amount,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_ns(),
             "status": "pending"
         }
-        self.transactions.append(tx)
+        self.transactions[tx["tx_hash"]] = tx
         
         if from_addr in self.agents:
             self.agents[from_addr].arp_tx_count += 1
@@ -277,9 +418,13 @@ class ARPxEthosIntegration:
         attest_type: str = "completed"
     ) -> Dict:
         """Attest a transaction (updates ARP + can sync to Ethos)"""
-        tx = next((t for t in self.transactions if t["tx_hash"] == tx_hash), None)
+        tx = self.transactions.get(tx_hash)
         if not tx:
             return {"error": "Transaction not found"}
+        if tx["status"] == "completed":
+            return {"error": "Transaction already attested"}
+        if not valid_rating(rating):
+            return {"error": "Rating out of range"}
         
         tx["status"] = "completed"
         
@@ -290,7 +435,7 @@ class ARPxEthosIntegration:
             "rating": rating,
             "feedback": feedback,
             "type": attest_type,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_ns(),
             "platform": "ARP",
             "synced_to_ethos": False  # Would sync in production
         }
@@ -299,15 +444,92 @@ class ARPxEthosIntegration:
         # Update agent ARP score
         if tx["from"] in self.agents:
             agent = self.agents[tx["from"]]
-            agent.arp_ratings.append({
-                "rating": rating,
-                "tx_hash": tx_hash,
-                "feedback": feedback
-            })
-            agent.calculate_unified_score()
+            agent.add_arp_rating(rating, tx_hash, feedback)
+            self._rescore(agent)
         
         return attestation
     
+    def submit_transactions_batch(self, events: Iterable[Tuple[str, str, float]]) -> List[Dict]:
+        """Record many transactions at once
+        
+        events are (from_addr, to_addr, amount) tuples. The batch shares one
+        timestamp and one draw for its hashes, and each agent's
+        transaction count is bumped once.
+        """
+        events = list(events)
+        timestamp = now_ns()
+        hashes = self.ids.tx_hashes(len(events))
+        tx_counts = defaultdict(int)
+        txs = []
+        for i, (from_addr, to_addr, amount) in enumerate(events):
+            tx = {
+                "tx_hash": hashes[i],
+                "from": from_addr,
+                "to": to_addr,
+                "amount": amount,
+                "timestamp": timestamp,
+                "status": "pending"
+            }
+            self.transactions[tx["tx_hash"]] = tx
+            txs.append(tx)
+            tx_counts[from_addr] += 1
+            tx_counts[to_addr] += 1
+        
+        for addr, count in tx_counts.items():
+            if addr in self.agents:
+                self.agents[addr].arp_tx_count += count
+        
+        return txs
+    
+    def attest_batch(self, attestations: Iterable[Tuple]) -> List[Dict]:
+        """Submit many ratings at once
+        
+        attestations are (tx_hash, rating[, feedback[, attest_type]]) tuples.
+        Each touched agent is rescored once after the whole batch; unknown or
+        already-attested transactions get an error entry in the results.
+        """
+        timestamp = now_ns()
+        touched: Dict[str, None] = {}  # Insertion-ordered set
+        results = []
+        for tx_hash, rating, *rest in attestations:
+            feedback = rest[0] if rest else ""
+            attest_type = rest[1] if len(rest) > 1 else "completed"
+            tx = self.transactions.get(tx_hash)
+            if not tx:
+                results.append({"error": "Transaction not found", "tx_hash": tx_hash})
+                continue
+            if tx["status"] == "completed":
+                results.append({"error": "Transaction already attested", "tx_hash": tx_hash})
+                continue
+            if not valid_rating(rating):
+                results.append({"error": "Rating out of range", "tx_hash": tx_hash})
+                continue
+            
+            tx["status"] = "completed"
+            attestation = {
+                "tx_hash": tx_hash,
+                "from": tx["from"],
+                "to": tx["to"],
+                "rating": rating,
+                "feedback": feedback,
+                "type": attest_type,
+                "timestamp": timestamp,
+                "platform": "ARP",
+                "synced_to_ethos": False
+            }
+            self.attestations.append(attestation)
+            results.append(attestation)
+            
+            if tx["from"] in self.agents:
+                self.agents[tx["from"]].add_arp_rating(rating, tx_hash, feedback)
+                touched[tx["from"]] = None
+        
+        for addr in touched:
+            if addr in self.agents:
+                self._rescore(self.agents[addr])
+        
+        return results
+    
     def shared_slash(self, address: str, reason: str, severity: str = "medium") -> Dict:
         """
         Slash an agent - synchronized across ARP and Ethos
@@ -325,15 +547,10 @@ class ARPxEthosIntegration:
         # ARP-style slash
         slash_amount = agent.arp_stake * 0.5
         agent.arp_stake -= slash_amount
-        agent.arp_ratings.append({
-            "rating": 1,
-            "tx_hash": "SHARED-SLASH",
-            "feedback": f"Shared slash: {reason}"
-        })
+        agent.add_arp_rating(1, "SHARED-SLASH", f"Shared slash: {reason}")
         
-        # Ethos-style impact
-        agent.ethos_slashes += 1
-        agent.ethos_credibility_score -= 15
+        # Ethos-style impact (the slash count drives the Ethos penalty)
+        self.update_ethos_profiles({address: {"slashes": agent.ethos_slashes + 1}})
         
         # Record shared event
         slash_event = {
@@ -342,14 +559,11 @@ class ARPxEthosIntegration:
             "severity": severity,
             "arp_penalty": slash_amount,
             "ethos_penalty": 15,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_ns(),
             "platforms": ["ARP", "Ethos"]
         }
         self.shared_slashing_events.append(slash_event)
         
-        # Recalculate unified score
-        agent.calculate_unified_score()
-        
         return {
             "success": True,
             "agent": agent.name,
@@ -370,8 +584,9 @@ class ARPxEthosIntegration:
         
         For demo, we simulate the response
         """
-        if eth_address in [a.eth_address for a in self.agents.values() if a.eth_address]:
-            agent = next(a for a in self.agents.values() if a.eth_address == eth_address)
+        address = self.eth_index.get(eth_address)
+        if address is not None:
+            agent = self.agents[address]
             return {
                 "address": eth_address,
                 "credibility_score": agent.ethos_credibility_score,
@@ -388,17 +603,132 @@ class ARPxEthosIntegration:
             }
         
         # Return default for unknown
-        return {
-            "address": eth_address,
-            "credibility_score": 50.0,  # Default
-            "wallet_age": 0,
-            "vouches": 0,
-            "reviews": {"positive": 0, "negative": 0},
-            "slashes": 0,
-            "sybil_risk": 0.5,  # Unknown = medium risk
-            "attestations": 0,
-            "credible_vouchers": 0
-        }
+        return default_profile(eth_address)
+    
+    def update_ethos_profiles(self, profiles: Dict[str, Dict]) -> Dict:
+        """Apply Ethos profile updates, keyed by agent address, and rescore changed agents
+        
+        Profiles use the query_ethos_api shape and may be partial. This is
+        the way Ethos data changes; each changed agent is rescored once.
+        """
+        updated = 0
+        unknown = []
+        for address, profile in profiles.items():
+            agent = self.agents.get(address)
+            if agent is None:
+                unknown.append(address)
+                continue
+            if agent.update_ethos(profile):
+                self._rescore(agent)
+                updated += 1
+        return {"updated": updated, "unchanged": len(profiles) - updated - len(unknown), "unknown": unknown}
+    
+    async def sync_ethos_profiles(self) -> Dict:
+        """Fetch every linked agent's Ethos profile and apply it with update_ethos_profiles
+        
+        Only profiles the API actually returned are applied: fallback
+        profiles (upstream down, circuit open) are not Ethos data, and
+        those agents keep their current fields ("not_fetched" counts them).
+        """
+        linked = {agent.eth_address: address for address, agent in self.agents.items() if agent.eth_address}
+        if self.ethos_lookup is None:
+            profiles = await self.fetch_ethos_profiles(linked)
+            fetched = set(profiles)
+        else:
+            profiles, fetched = await self.ethos_lookup.resolve_many(linked)
+        result = self.update_ethos_profiles({linked[eth]: profiles[eth] for eth in fetched if eth in linked})
+        result["not_fetched"] = len(linked) - len(fetched)
+        return result
+    
+    async def lookup_ethos_profile(self, eth_address: str) -> Dict:
+        """Ethos profile from the live API when an ethos_client is set
+        
+        Slow answers are hedged and a failing API is cut off by the circuit
+        breaker; either way the last good or default profile is returned.
+        Without a client this answers from query_ethos_api's simulation.
+        """
+        if self.ethos_lookup is None:
+            return self.query_ethos_api(eth_address)
+        return await self.ethos_lookup(eth_address)
+    
+    async def fetch_ethos_profiles(self, eth_addresses: Iterable[str]) -> Dict[str, Dict]:
+        """Ethos profiles for many addresses, as one guarded batch when an ethos_client is set"""
+        if self.ethos_lookup is None:
+            return {eth_address: self.query_ethos_api(eth_address) for eth_address in eth_addresses}
+        return await self.ethos_lookup.many(eth_addresses)
+    
+    def verify_arp_score(self, address: str) -> Dict:
+        """Check an agent's ARP rating aggregates and rescore it if they had drifted"""
+        if address not in self.agents:
+            return {"error": "Agent not found"}
+        
+        agent = self.agents[address]
+        result = agent.verify_arp_score()
+        if not result["ok"]:
+            self._rescore(agent)
+        return result
+    
+    def rescore_all(self, verify: bool = False) -> Dict:
+        """Recompute ARP, Ethos and unified scores for every agent in one pass
+        
+        Vectorized with NumPy when it is installed (see arp_batch), scalar
+        otherwise. verify=True re-runs the scalar methods and reports the
+        largest unified-score difference from the batch result.
+        """
+        agents = list(self.agents.values())
+        if arp_batch.HAS_NUMPY and agents:
+            col = arp_batch.column
+            arp = arp_batch.reputation_scores(
+                col(agents, "arp_rating_sum"),
+                col(agents, "arp_rating_count"),
+                col(agents, "arp_stake") + col(agents, "arp_delegated"),
+                col(agents, "arp_tx_count"),
+                RATING_WEIGHT, STAKE_WEIGHT, TX_WEIGHT
+            )
+            ethos = arp_batch.ethos_scores(
+                col(agents, "ethos_wallet_age"),
+                col(agents, "ethos_vouches"),
+                col(agents, "ethos_positive_reviews"),
+                col(agents, "ethos_negative_reviews"),
+                col(agents, "ethos_slashes"),
+                col(agents, "ethos_attestations"),
+                col(agents, "ethos_credible_vouchers"),
+                col(agents, "ethos_sybil_risk")
+            )
+            unified = arp_batch.unified_scores(arp, ethos, ARP_WEIGHT, ETHOS_WEIGHT)
+            scores = unified.tolist()
+            arp_tiers = arp_batch.tier_codes(arp, TIER_BOUNDS).tolist()
+            unified_tiers = arp_batch.tier_codes(unified, UNIFIED_TIER_BOUNDS).tolist()
+            rows = zip(agents, arp.tolist(), ethos.tolist(), scores, arp_tiers, unified_tiers)
+            for agent, arp_score, ethos_score, unified_score, arp_tier, unified_tier in rows:
+                agent.arp_score = arp_score
+                agent.arp_tier_code = arp_tier
+                agent.ethos_credibility_score = ethos_score
+                agent.ethos_stale = False
+                agent.unified_score = unified_score
+                agent.unified_tier_code = unified_tier
+        else:
+            for agent in agents:
+                agent.ethos_stale = True
+            scores = [agent.calculate_unified_score() for agent in agents]
+        self.leaderboards["unified_score"].rebuild((a.address, a.unified_score) for a in agents)
+        self.leaderboards["arp_score"].rebuild((a.address, a.arp_score) for a in agents)
+        self.leaderboards["ethos_score"].rebuild((a.address, a.ethos_credibility_score) for a in agents)
+        self.leaderboard_version += 1
+        
+        result = {"agents": len(agents), "vectorized": arp_batch.HAS_NUMPY}
+        if verify:
+            for agent in agents:
+                agent.ethos_stale = True
+            result["max_drift"] = arp_batch.max_drift(
+                scores, [agent.calculate_unified_score() for agent in agents]
+            )
+        return result
+    
+    def get_agent_by_id(self, agent_id: int) -> Optional[Agent]:
+        if not 0 <= agent_id < len(self.agent_ids):
+            return None
+        return self.agents.get(self.agent_ids[agent_id])
     
     def get_trust_score(self, address: str, show_details: bool = False) -> Dict:
         """Get unified trust score for an agent"""
@@ -410,18 +740,101 @@ class ARPxEthosIntegration:
     
     def get_all_agents(self, sort_by: str = "unified_score") -> List[Dict]:
         """Get all agents sorted by criteria"""
-        agents_list = [a.to_dict() for a in self.agents.values()]
-        if sort_by == "unified_score":
-            agents_list.sort(key=lambda x: x["unified_score"], reverse=True)
-        elif sort_by == "arp_score":
-            agents_list.sort(key=lambda x: x["arp_score"], reverse=True)
-        elif sort_by == "ethos_score":
-            agents_list.sort(key=lambda x: x["ethos_score"], reverse=True)
-        return agents_list
-    
-    def get_shared_leaderboard(self) -> List[Dict]:
+        return list(self.iter_agents(sort_by))
+    
+    def iter_agents(self, sort_by: str = "unified_score", include_all: bool = False) -> Iterator[Dict]:
+        """Agent dicts one at a time, sorted by criteria"""
+        addresses = self.leaderboards[sort_by] if sort_by in self.leaderboards else self.agents
+        for address in addresses:
+            yield self.agents[address].to_dict(include_all)
+    
+    def export(self, kind: str, target: Any, fmt: str = "jsonl", chunk_size: int = 1000) -> Dict:
+        """Stream agents, transactions, attestations or slashing events to a
+        binary file or socket (see arp_export)
+        
+        fmt is "jsonl" or "json" (one streamed array); agents are exported
+        with full details in unified-score order.
+        """
+        sources = {
+            "agents": lambda: (
+                dict(self.agents[a].to_dict(True), address=a) for a in self.leaderboards["unified_score"]
+            ),
+            "transactions": lambda: iter(self.transactions.values()),
+            "attestations": lambda: iter(self.attestations),
+            "slashing_events": lambda: iter(self.shared_slashing_events),
+        }
+        if kind not in sources:
+            return {"error": f"Unknown export: {kind}"}
+        if fmt not in FORMATS:
+            return {"error": f"Unknown format: {fmt}"}
+        return {"kind": kind, "exported": export_records(sources[kind](), target, fmt, chunk_size)}
+    
+    def get_shared_leaderboard(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
         """Get unified trust leaderboard"""
-        return self.get_all_agents(sort_by="unified_score")
+        return self.get_leaderboard_page("unified_score", offset, limit)
+    
+    def get_leaderboard_page(
+        self,
+        sort_by: str = "unified_score",
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Page of agents ranked by a score, without sorting the population"""
+        if sort_by not in self.leaderboards:
+            return []
+        return [
+            self.agents[address].to_dict()
+            for address, _ in self.leaderboards[sort_by].page(offset, limit)
+        ]
+    
+    def get_leaderboard_payload(
+        self,
+        sort_by: str = "unified_score",
+        offset: int = 0,
+        limit: Optional[int] = None,
+        if_none_match: Optional[str] = None
+    ) -> Dict:
+        """Encoded leaderboard page for serving, cached until scores change
+        
+        Returns the page's ETag and version; the JSON body is None (not
+        modified) when if_none_match already names the current ETag.
+        """
+        if sort_by not in self.leaderboards:
+            return {"error": f"Unknown leaderboard: {sort_by}"}
+        etag, body = self.leaderboard_pages.get(
+            (sort_by, offset, limit),
+            self.leaderboard_version,
+            lambda: self.get_leaderboard_page(sort_by, offset, limit)
+        )
+        not_modified = if_none_match == etag
+        return {
+            "etag": etag,
+            "version": self.leaderboard_version,
+            "not_modified": not_modified,
+            "body": None if not_modified else body
+        }
+    
+    def get_rank(self, address: str, sort_by: str = "unified_score") -> Optional[int]:
+        """1-based rank of an agent on a leaderboard"""
+        if sort_by not in self.leaderboards:
+            return None
+        return self.leaderboards[sort_by].rank(address)
+    
+    def get_agents_by_score(
+        self,
+        min_score: float,
+        max_score: float = float('inf'),
+        sort_by: str = "unified_score",
+        offset: int = 0,
+        limit: Optional[int] = 50
+    ) -> List[Dict]:
+        """Page through agents whose score falls within a range"""
+        if sort_by not in self.leaderboards:
+            return []
+        return [
+            self.agents[address].to_dict()
+            for address, _ in self.leaderboards[sort_by].score_range(min_score, max_score, offset, limit)
+        ]
 
 
 class ARPxEthosDemo:
@@ -439,7 +852,7 @@ class ARPxEthosDemo:
         # Agent 1: Established crypto OG
         agent1 = self.integration.register_agent(
             name="CryptoKing-OG",
-            address="0x" + uuid.uuid4().hex[:40],
+            address=self.integration.ids.tx_hash(),
             eth_address="0x1111111111111111111111111111111111111111",
             arp_stake=100.0,
             ethos_wallet_age=5.0,  # 5 years
@@ -455,7 +868,7 @@ class ARPxEthosDemo:
         # Agent 2: New AI agent with good track record
         agent2 = self.integration.register_agent(
             name="Agent-Genius",
-            address="0x" + uuid.uuid4().hex[:40],
+            address=self.integration.ids.tx_hash(),
             eth_address="0x2222222222222222222222222222222222222222",
             arp_stake=50.0,
             ethos_wallet_age=1.0,
@@ -471,7 +884,7 @@ class ARPxEthosDemo:
         # Agent 3: Suspected scammer
         agent3 = self.integration.register_agent(
             name="Shady-Scammer",
-            address="0x" + uuid.uuid4().hex[:40],
+            address=self.integration.ids.tx_hash(),
             eth_address="0x3333333333333333333333333333333333333333",
             arp_stake=10.0,
             ethos_wallet_age=0.1,  # Very new
@@ -487,7 +900,7 @@ class ARPxEthosDemo:
         # Agent 4: Fresh newcomer
         agent4 = self.integration.register_agent(
             name="Newcomer-Bob",
-            address="0x" + uuid.uuid4().hex[:40],
+            address=self.integration.ids.tx_hash(),
             eth_address="0x4444444444444444444444444444444444444444",
             arp_stake=5.0,
             ethos_wallet_age=0.0,
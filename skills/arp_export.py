@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+ARP Streaming Export
+
+Generator-based JSON exporters for agents, transactions, attestations,
+delegations and slashing events. Records are encoded one at a time and
+written in chunks, so exporting a multi-GB history needs memory for one
+chunk, not for the whole history.
+
+Two formats:
+
+- "jsonl": one JSON object per line (JSON Lines)
+- "json":  a single JSON array, streamed as "[", items, "]"
+
+Epoch-nanosecond timestamps (see arp_ids) are rendered as ISO 8601 here.
+
+PayloadCache keeps encoded read payloads (leaderboard pages) for reuse
+until the engine's data version moves on.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Tuple
+
+from arp_ids import iso_timestamp
+
+FORMATS = ("jsonl", "json")
+TIMESTAMP_KEYS = ("timestamp", "created_at", "expires_at", "minted_at", "transferred_at")
+
+_encoder = json.JSONEncoder(separators=(",", ":"), default=str)
+
+def _serializable(record: Dict) -> Dict:
+    """The record with nanosecond timestamps formatted (copied only if needed)"""
+    for key in TIMESTAMP_KEYS:
+        if isinstance(record.get(key), int):
+            record = dict(record)
+            for key in TIMESTAMP_KEYS:
+                if isinstance(record.get(key), int):
+                    record[key] = iso_timestamp(record[key])
+            break
+    return record
+
+def iter_encoded(records: Iterable[Dict], fmt: str = "jsonl", chunk_size: int = 1000) -> Iterator[bytes]:
+    """Encoded output in chunks of up to chunk_size records
+
+    Suitable as a streaming HTTP response body as well as for export().
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    encode = _encoder.encode
+    separator = "\n" if fmt == "jsonl" else ","
+    if fmt == "json":
+        yield b"["
+    first = True
+    chunk = []
+    for record in records:
+        chunk.append(encode(_serializable(record)))
+        if len(chunk) >= chunk_size:
+            yield _join(chunk, separator, fmt, first)
+            first = False
+            chunk = []
+    if chunk:
+        yield _join(chunk, separator, fmt, first)
+    if fmt == "json":
+        yield b"]"
+
+def _join(chunk, separator: str, fmt: str, first: bool) -> bytes:
+    body = separator.join(chunk)
+    if fmt == "jsonl":
+        return (body + "\n").encode()
+    return (body if first else "," + body).encode()
+
+def encode_json(payload: Any) -> bytes:
+    return _encoder.encode(payload).encode()
+
+class PayloadCache:
+    """
+    LRU cache of encoded payloads, each valid for one data version.
+
+    The ETag is a BLAKE2b digest of the encoded bytes, so a page whose
+    content did not change keeps its ETag across versions and clients can
+    revalidate, while changed content cannot plausibly collide.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[int, str, bytes]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: int, build: Callable[[], Any]) -> Tuple[str, bytes]:
+        """(etag, body) for key at version, calling build() only on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+        self.misses += 1
+        body = encode_json(build())
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self._entries[key] = (version, etag, body)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return etag, body
+
+def export_records(records: Iterable[Dict], target: Any, fmt: str = "jsonl", chunk_size: int = 1000) -> int:
+    """Stream records to a binary file object or socket; returns the record count"""
+    write = getattr(target, "write", None) or target.sendall
+    count = 0
+
+    def counted():
+        nonlocal count
+        for record in records:
+            count += 1
+            yield record
+
+    for data in iter_encoded(counted(), fmt, chunk_size):
+        write(data)
+    return count
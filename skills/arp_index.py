@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+ARP Indexes
+
+In-memory index structures shared by the ARP engines.
+
+- LeaderboardIndex: order-statistics index over agent scores
+  (top-K, rank-of-agent and score-range pages without a full sort)
+- WeightedSampler: Fenwick tree over per-agent weights for
+  stake-weighted sampling without replacement
+- ExpiryQueue: deadline heap for markets and council cases
+"""
+
+import heapq
+import random
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+class LeaderboardIndex:
+    """
+    Order-statistics index over agent scores, highest score first.
+
+    Entries live in a list of sorted buckets with a Fenwick tree over the
+    bucket sizes, so rank and offset lookups are O(log n) and an update
+    only shifts entries inside a single bucket. Ties keep the order in
+    which addresses were first indexed.
+    """
+
+    BUCKET_SIZE = 512
+
+    def __init__(self):
+        self._buckets: List[List[Tuple[float, int, str]]] = []
+        self._maxes: List[Tuple[float, int, str]] = []
+        self._keys: Dict[str, Tuple[float, int, str]] = {}
+        self._seq: Dict[str, int] = {}
+        self._tree: Optional[List[int]] = None  # Fenwick tree, rebuilt lazily
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        for bucket in self._buckets:
+            for key in bucket:
+                yield key[2]
+
+    def score(self, address: str) -> Optional[float]:
+        key = self._keys.get(address)
+        return -key[0] if key else None
+
+    def update(self, address: str, score: float):
+        """Insert an agent or move it to its new score"""
+        key = self._keys.get(address)
+        if key is not None:
+            if key[0] == -score:
+                return
+            self._delete(key)
+        seq = self._seq.setdefault(address, len(self._seq))
+        key = (-score, seq, address)
+        self._keys[address] = key
+        self._insert(key)
+
+    def rebuild(self, items: Iterable[Tuple[str, float]]):
+        """Replace the whole index with one sort instead of n updates"""
+        keys = sorted(
+            (-score, self._seq.setdefault(address, len(self._seq)), address)
+            for address, score in items
+        )
+        self._keys = {key[2]: key for key in keys}
+        self._buckets = [keys[i:i + self.BUCKET_SIZE] for i in range(0, len(keys), self.BUCKET_SIZE)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._tree = None
+
+    def remove(self, address: str):
+        key = self._keys.pop(address, None)
+        if key is not None:
+            self._delete(key)
+
+    def rank(self, address: str) -> Optional[int]:
+        """1-based rank of an agent, or None if it is not indexed"""
+        key = self._keys.get(address)
+        if key is None:
+            return None
+        i = bisect_left(self._maxes, key)
+        return self._prefix(i) + bisect_left(self._buckets[i], key) + 1
+
+    def top(self, k: int) -> List[Tuple[str, float]]:
+        return self.page(0, k)
+
+    def page(self, offset: int = 0, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(address, score) pairs for ranks offset+1 .. offset+limit"""
+        if offset >= len(self._keys) or limit == 0:
+            return []
+        i, pos = self._locate(offset)
+        return self._collect(i, pos, limit)
+
+    def score_range(
+        self,
+        min_score: float,
+        max_score: float,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """(address, score) pairs with min_score <= score <= max_score"""
+        start = (-max_score, -1, "")
+        i = bisect_left(self._maxes, start)
+        if i == len(self._buckets):
+            return []
+        start_rank = self._prefix(i) + bisect_left(self._buckets[i], start)
+        end_key = (-min_score, float('inf'), "")
+        j = bisect_right(self._maxes, end_key)
+        if j == len(self._buckets):
+            end_rank = len(self._keys)
+        else:
+            end_rank = self._prefix(j) + bisect_right(self._buckets[j], end_key)
+        count = max(0, end_rank - start_rank - offset)
+        if limit is not None:
+            count = min(count, limit)
+        return self.page(start_rank + offset, count)
+
+    def _collect(self, i: int, pos: int, limit: Optional[int]) -> List[Tuple[str, float]]:
+        results = []
+        while i < len(self._buckets):
+            for key in self._buckets[i][pos:]:
+                if limit is not None and len(results) >= limit:
+                    return results
+                results.append((key[2], -key[0]))
+            i += 1
+            pos = 0
+        return results
+
+    def _insert(self, key: Tuple[float, int, str]):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._tree = None
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(self._buckets):
+            i -= 1
+        bucket = self._buckets[i]
+        insort(bucket, key)
+        self._maxes[i] = bucket[-1]
+        if len(bucket) > 2 * self.BUCKET_SIZE:
+            self._buckets[i:i + 1] = [bucket[:self.BUCKET_SIZE], bucket[self.BUCKET_SIZE:]]
+            self._maxes[i:i + 1] = [bucket[self.BUCKET_SIZE - 1], bucket[-1]]
+            self._tree = None
+        else:
+            self._tree_add(i, 1)
+
+    def _delete(self, key: Tuple[float, int, str]):
+        i = bisect_left(self._maxes, key)
+        bucket = self._buckets[i]
+        del bucket[bisect_left(bucket, key)]
+        if bucket:
+            self._maxes[i] = bucket[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+            self._tree = None
+
+    def _build_tree(self) -> List[int]:
+        tree = [0] + [len(b) for b in self._buckets]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+        return tree
+
+    def _tree_add(self, i: int, delta: int):
+        if self._tree is None:
+            return
+        i += 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, i: int) -> int:
+        """Number of entries in buckets [0, i)"""
+        tree = self._tree if self._tree is not None else self._build_tree()
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, offset: int) -> Tuple[int, int]:
+        """(bucket, position) of the entry at a 0-based offset"""
+        tree = self._tree if self._tree is not None else self._build_tree()
+        i = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            nxt = i + step
+            if nxt < len(tree) and tree[nxt] <= offset:
+                i = nxt
+                offset -= tree[nxt]
+            step >>= 1
+        return i, offset
+
+
+class WeightedSampler:
+    """
+    Fenwick tree over per-key weights.
+
+    Setting a weight and drawing a key are both O(log n), so sampling k
+    keys without replacement costs O(k log n) however large the population.
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._weights: List[float] = []
+        self._tree: List[float] = [0.0]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def total(self) -> float:
+        return self._prefix(len(self._keys))
+
+    def weight(self, key: str) -> float:
+        slot = self._slots.get(key)
+        return self._weights[slot] if slot is not None else 0.0
+
+    def set(self, key: str, weight: float):
+        """Insert a key or change its weight (negative weights count as 0)"""
+        weight = max(weight, 0.0)
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self._keys)
+            self._slots[key] = slot
+            self._keys.append(key)
+            self._weights.append(weight)
+            i = slot + 1
+            # New node covers (i - lowbit(i), i]; everything but itself is known
+            self._tree.append(weight + self._prefix(i - 1) - self._prefix(i - (i & -i)))
+            return
+        self._add(slot, weight - self._weights[slot])
+        self._weights[slot] = weight
+
+    def sample(
+        self,
+        k: int,
+        exclude: Iterable[str] = (),
+        rng: Optional[random.Random] = None
+    ) -> List[str]:
+        """Draw up to k distinct keys with probability proportional to weight"""
+        rng = rng or random
+        removed: List[Tuple[int, float]] = []
+        for key in exclude:
+            slot = self._slots.get(key)
+            if slot is not None and self._weights[slot] > 0:
+                removed.append((slot, self._weights[slot]))
+                self._add(slot, -self._weights[slot])
+                self._weights[slot] = 0.0
+        picked = []
+        try:
+            while len(picked) < k:
+                total = self._prefix(len(self._keys))
+                if total <= 0:
+                    break
+                slot = self._find(rng.random() * total)
+                if self._weights[slot] <= 0:
+                    break  # Only float residue left in the tree
+                picked.append(self._keys[slot])
+                removed.append((slot, self._weights[slot]))
+                self._add(slot, -self._weights[slot])
+                self._weights[slot] = 0.0
+        finally:
+            for slot, weight in removed:
+                self._add(slot, weight)
+                self._weights[slot] = weight
+        return picked
+
+    def _add(self, slot: int, delta: float):
+        i = slot + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, i: int) -> float:
+        total = 0.0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _find(self, target: float) -> int:
+        """Slot whose cumulative weight range contains target"""
+        i = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = i + step
+            if nxt < len(self._tree) and self._tree[nxt] <= target:
+                i = nxt
+                target -= self._tree[nxt]
+            step >>= 1
+        return min(i, len(self._keys) - 1)
+
+
+class ExpiryQueue:
+    """
+    Min-heap of (deadline, kind, item_id) entries.
+
+    Items resolved before their deadline are not removed from the heap;
+    callers skip them when they come due, which keeps scheduling O(log n).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, str, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Tuple[float, str, str]]) -> "ExpiryQueue":
+        queue = cls()
+        queue._heap = [tuple(entry) for entry in entries]
+        heapq.heapify(queue._heap)
+        return queue
+
+    def entries(self) -> List[Tuple[float, str, str]]:
+        """Every scheduled entry, in heap order"""
+        return list(self._heap)
+
+    def schedule(self, deadline: float, kind: str, item_id: str):
+        heapq.heappush(self._heap, (deadline, kind, item_id))
+
+    def next_deadline(self) -> Optional[float]:
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """(kind, item_id) pairs whose deadline is at or before now"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            if limit is not None and len(due) >= limit:
+                break
+            _, kind, item_id = heapq.heappop(self._heap)
+            due.append((kind, item_id))
+        return due
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+ARP Rating Storage
+
+Compact columnar storage for agent ratings. Each rating costs 30 bytes in
+the hot set instead of a dict of three Python objects:
+
+- rating:   int8 array
+- tx_hash:  20 raw bytes plus a 1-byte length for 0x-prefixed hex hashes
+            (other labels such as "SLASH" spill to a side dict)
+- feedback: 4-byte id into the store's own interning pool, which drops
+            strings once no detail row refers to them
+- time:     4-byte epoch seconds
+
+With a RetentionPolicy, ratings past the detail window are folded into
+per-period (sum, count) buckets, bounding per-agent memory while totals
+and counts stay exact.
+
+Ratings must fit the int8 column (RATING_MIN..RATING_MAX); engines check
+valid_rating() before applying anything.
+"""
+
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Union
+
+HASH_BYTES = 20
+DAY_SECONDS = 86400
+RATING_MIN = -128  # Range of the int8 rating column
+RATING_MAX = 127
+
+def valid_rating(rating: int) -> bool:
+    return isinstance(rating, int) and RATING_MIN <= rating <= RATING_MAX
+
+class FeedbackPool:
+    """Interns feedback strings so repeated text is stored once"""
+
+    def __init__(self):
+        self._strings: List[str] = [""]
+        self._ids: Dict[str, int] = {"": 0}
+        self.nbytes = 0  # Approximate bytes of the interned strings
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def intern(self, text: str) -> int:
+        text_id = self._ids.get(text)
+        if text_id is None:
+            text_id = len(self._strings)
+            self._strings.append(text)
+            self._ids[text] = text_id
+            self.nbytes += sys.getsizeof(text)
+        return text_id
+
+    def get(self, text_id: int) -> str:
+        return self._strings[text_id]
+
+def pack_hash(tx_hash: str) -> Optional[bytes]:
+    """Raw bytes of a 0x-prefixed lowercase hex hash, or None if it isn't one"""
+    digits = tx_hash[2:]
+    if not tx_hash.startswith("0x") or not digits or len(digits) > 2 * HASH_BYTES or len(digits) % 2:
+        return None
+    try:
+        raw = bytes.fromhex(digits)
+    except ValueError:
+        return None
+    return raw if raw.hex() == digits else None
+
+def unpack_hash(raw: bytes) -> str:
+    return "0x" + raw.hex()
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    Which ratings a RatingStore keeps in full detail.
+
+    Ratings beyond the last keep_last, or older than max_age_days, are
+    folded into buckets of period_days. Compaction runs once the detail
+    window has doubled (or aged a full period past the limit), so its cost
+    is amortized over many adds.
+    """
+    keep_last: Optional[int] = None
+    max_age_days: Optional[float] = None
+    period_days: float = 1.0
+
+class _Columns:
+    """A RatingStore's detail rows, allocated on its first add()"""
+
+    __slots__ = ("ratings", "hashes", "hash_lens", "feedback", "times", "spilled", "pool")
+
+    def __init__(self):
+        self.ratings = array("b")
+        self.hashes = bytearray()
+        self.hash_lens = bytearray()
+        self.feedback = array("I")
+        self.times = array("I")
+        self.spilled: Dict[int, str] = {}  # row -> tx_hash that isn't packable hex
+        self.pool = FeedbackPool()  # Lives and dies with the store
+
+    def row(self, row: int) -> Dict:
+        length = self.hash_lens[row]
+        if length:
+            start = row * HASH_BYTES
+            tx_hash = unpack_hash(bytes(self.hashes[start:start + length]))
+        else:
+            tx_hash = self.spilled[row]
+        return {
+            "rating": self.ratings[row],
+            "tx_hash": tx_hash,
+            "feedback": self.pool.get(self.feedback[row]),
+            "time": self.times[row]
+        }
+
+    def nbytes(self) -> int:
+        return (
+            len(self.ratings) * self.ratings.itemsize
+            + len(self.hashes)
+            + len(self.hash_lens)
+            + len(self.feedback) * self.feedback.itemsize
+            + len(self.times) * self.times.itemsize
+            + self.pool.nbytes
+        )
+
+class RatingStore:
+    """
+    Append-only columnar rating log that reads back as rating dicts.
+
+    Iterating, indexing and len() behave like the list of
+    {"rating", "tx_hash", "feedback"} dicts it replaces, over the ratings
+    still held in detail; count() and total() also cover folded ones.
+    Columns and buckets are only allocated once there is something to
+    hold, so a store with no ratings is one small object.
+    """
+
+    __slots__ = ("_cols", "_buckets", "retention")
+
+    def __init__(self, retention: Optional[RetentionPolicy] = None):
+        self._cols: Optional[_Columns] = None  # Detail rows, None until the first add()
+        self._buckets: Optional[Dict[int, List[int]]] = None  # period start -> [sum, count] of folded ratings
+        self.retention = retention
+
+    def add(self, rating: int, tx_hash: str, feedback: str = "", at: Optional[float] = None):
+        """Append a rating given at epoch time `at` (default: now)"""
+        if not valid_rating(rating):
+            raise ValueError(f"Rating {rating!r} is outside {RATING_MIN}..{RATING_MAX}")
+        at = time.time() if at is None else at
+        if self._cols is None:
+            self._cols = _Columns()
+        cols = self._cols
+        row = len(cols.ratings)
+        cols.ratings.append(rating)
+        raw = pack_hash(tx_hash)
+        if raw is None:
+            cols.spilled[row] = tx_hash
+            cols.hashes += bytes(HASH_BYTES)
+            cols.hash_lens.append(0)
+        else:
+            cols.hashes += raw.ljust(HASH_BYTES, b"\0")
+            cols.hash_lens.append(len(raw))
+        cols.feedback.append(cols.pool.intern(feedback))
+        cols.times.append(int(at))
+        if self.retention is not None and self._compaction_due(at):
+            self.compact(at)
+
+    def _compaction_due(self, now: float) -> bool:
+        policy = self.retention
+        times = self._cols.times
+        if policy.keep_last is not None and len(times) > 2 * policy.keep_last:
+            return True
+        if policy.max_age_days is not None and times:
+            limit = (policy.max_age_days + policy.period_days) * DAY_SECONDS
+            return times[0] < now - limit
+        return False
+
+    def compact(self, now: Optional[float] = None, policy: Optional[RetentionPolicy] = None) -> int:
+        """Fold ratings outside the retention window into period buckets
+
+        Uses the store's own policy unless one is given; returns the number
+        of ratings folded.
+        """
+        policy = policy or self.retention
+        cols = self._cols
+        if policy is None or cols is None:
+            return 0
+        now = time.time() if now is None else now
+        fold = 0
+        if policy.keep_last is not None:
+            fold = max(len(cols.ratings) - policy.keep_last, 0)
+        if policy.max_age_days is not None:
+            cutoff = now - policy.max_age_days * DAY_SECONDS
+            while fold < len(cols.times) and cols.times[fold] < cutoff:
+                fold += 1
+        if not fold:
+            return 0
+
+        period = max(int(policy.period_days * DAY_SECONDS), 1)
+        if self._buckets is None:
+            self._buckets = {}
+        for row in range(fold):
+            bucket = self._buckets.setdefault(cols.times[row] // period * period, [0, 0])
+            bucket[0] += cols.ratings[row]
+            bucket[1] += 1
+        if fold == len(cols.ratings):
+            self._cols = None  # Everything folded: release the columns and pool
+            return fold
+        del cols.ratings[:fold]
+        del cols.hashes[:fold * HASH_BYTES]
+        del cols.hash_lens[:fold]
+        del cols.feedback[:fold]
+        del cols.times[:fold]
+        cols.spilled = {row - fold: tx_hash for row, tx_hash in cols.spilled.items() if row >= fold}
+        self._repack_feedback()
+        return fold
+
+    def _repack_feedback(self):
+        """Rebuild the feedback pool from the remaining rows, dropping unreferenced strings"""
+        cols = self._cols
+        old, cols.pool = cols.pool, FeedbackPool()
+        cols.feedback = array("I", (cols.pool.intern(old.get(text_id)) for text_id in cols.feedback))
+
+    def buckets(self) -> List[List[int]]:
+        """Folded ratings as [period_start, sum, count], oldest first"""
+        if not self._buckets:
+            return []
+        return [[start, total, count] for start, (total, count) in sorted(self._buckets.items())]
+
+    def restore_buckets(self, buckets: List[List[int]]):
+        """Merge buckets produced by buckets() (e.g. from a snapshot)"""
+        for start, total, count in buckets:
+            if self._buckets is None:
+                self._buckets = {}
+            bucket = self._buckets.setdefault(start, [0, 0])
+            bucket[0] += total
+            bucket[1] += count
+
+    def append(self, entry: Dict):
+        """List-compatible append of a rating dict"""
+        self.add(entry["rating"], entry["tx_hash"], entry.get("feedback", ""))
+
+    def __len__(self) -> int:
+        return len(self._cols.ratings) if self._cols is not None else 0
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict, List[Dict]]:
+        size = len(self)
+        if isinstance(index, slice):
+            return [self._cols.row(row) for row in range(*index.indices(size))]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("rating index out of range")
+        return self._cols.row(index)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for row in range(len(self)):
+            yield self._cols.row(row)
+
+    def __repr__(self) -> str:
+        return f"RatingStore({len(self)} ratings, {len(self._buckets or ())} buckets)"
+
+    def values(self) -> array:
+        """The raw rating column (detail rows only)"""
+        return self._cols.ratings if self._cols is not None else array("b")
+
+    def total(self) -> int:
+        """Sum of every rating, folded ones included"""
+        detail = sum(self._cols.ratings) if self._cols is not None else 0
+        return detail + sum(total for total, _ in (self._buckets or {}).values())
+
+    def count(self) -> int:
+        """Number of ratings, folded ones included"""
+        return len(self) + sum(count for _, count in (self._buckets or {}).values())
+
+    def nbytes(self) -> int:
+        """Approximate bytes held by the columns, feedback text and buckets (excluding spilled labels)"""
+        detail = self._cols.nbytes() if self._cols is not None else 0
+        return detail + len(self._buckets or ()) * 24
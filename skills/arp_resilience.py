@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+ARP Upstream Resilience
+
+Guards async upstream lookups (Ethos profiles, Rentahuman verification) so
+a slow or failing upstream cannot stall trust checks:
+
+- hedging: if an attempt has not answered by the observed p95 latency, a
+  second identical attempt is started and the first answer wins
+- deadline: no call waits longer than deadline seconds in total
+- circuit breaker: after failure_threshold consecutive failures calls fail
+  fast for reset_timeout seconds, then one probe call decides whether the
+  upstream is healthy again
+- fallback: failed and short-circuited calls answer with the last good
+  value for the key, or fallback(key) when there is none
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN  # Let exactly this caller probe
+            return True
+        return False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+
+    def release_probe(self):
+        """Give up a half-open probe that ended without an answer (e.g. cancelled)
+
+        The circuit goes back to open with its original open time, so the
+        next call is allowed to probe again.
+        """
+        if self.state == HALF_OPEN:
+            self.state = OPEN
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+            self.state = OPEN
+            self.opened_at = self.clock()
+
+class LatencyWindow:
+    """Recent call latencies, with a quantile recomputed every few samples"""
+
+    def __init__(self, size: int = 256, quantile: float = 0.95, refresh_every: int = 16):
+        self.samples = deque(maxlen=size)
+        self.quantile = quantile
+        self.refresh_every = refresh_every
+        self._pending = 0
+        self.value: Optional[float] = None  # None until the first refresh
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+        self._pending += 1
+        if self._pending >= self.refresh_every or self.value is None:
+            ordered = sorted(self.samples)
+            self.value = ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))]
+            self._pending = 0
+
+class ResilientLookup:
+    """
+    Hedged, deadline-bounded, circuit-broken wrapper around fetch(key).
+
+    Calling it never raises for upstream trouble: it returns the fetched
+    value, or the fallback. resolve() also says which of the two it was,
+    for callers that must not treat a fallback as real data.
+
+    fetch_many(keys) -> {key: value}, when given, serves many() with one
+    guarded batch call instead of one per key.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Hashable], Awaitable[Any]],
+        fallback: Callable[[Hashable], Any],
+        fetch_many: Optional[Callable[[List], Awaitable[Dict]]] = None,
+        deadline: float = 2.0,
+        min_hedge_delay: float = 0.005,
+        breaker: Optional[CircuitBreaker] = None,
+        cache_size: int = 10000
+    ):
+        self.fetch = fetch
+        self.fallback = fallback
+        self.fetch_many = fetch_many
+        self.deadline = deadline
+        self.min_hedge_delay = min_hedge_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.cache_size = cache_size
+        self._last_good: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.latency = LatencyWindow()
+        self.batch_latency = LatencyWindow()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.fallbacks = 0
+
+    async def __call__(self, key: Hashable) -> Any:
+        return (await self.resolve(key))[0]
+
+    async def resolve(self, key: Hashable) -> Tuple[Any, bool]:
+        """(value, fetched); fetched is False when value is a fallback"""
+        self.calls += 1
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            return self._fall_back(key), False
+        try:
+            value = await asyncio.wait_for(self._hedged(lambda: self.fetch(key), self.latency), self.deadline)
+        except Exception:
+            self._failed()
+            return self._fall_back(key), False
+        except BaseException:
+            self.breaker.release_probe()  # Cancelled: never leave the circuit half-open
+            raise
+        self.breaker.record_success()
+        self._remember(key, value)
+        return value, True
+
+    async def many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Values for many keys; per-key fallbacks if the batch fails or the circuit is open"""
+        return (await self.resolve_many(keys))[0]
+
+    async def resolve_many(self, keys: Iterable[Hashable]) -> Tuple[Dict[Hashable, Any], set]:
+        """(values, fetched keys); keys outside fetched hold fallbacks"""
+        keys = list(dict.fromkeys(keys))
+        if self.fetch_many is None:
+            results = await asyncio.gather(*(self.resolve(key) for key in keys))
+            values = {key: value for key, (value, _) in zip(keys, results)}
+            return values, {key for key, (_, fetched) in zip(keys, results) if fetched}
+        self.calls += 1
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            return {key: self._fall_back(key) for key in keys}, set()
+        try:
+            values = await asyncio.wait_for(self._hedged(lambda: self.fetch_many(keys), self.batch_latency), self.deadline)
+        except Exception:
+            self._failed()
+            return {key: self._fall_back(key) for key in keys}, set()
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+        self.breaker.record_success()
+        for key, value in values.items():
+            self._remember(key, value)
+        fetched = {key for key in keys if key in values}
+        return {key: values[key] if key in fetched else self._fall_back(key) for key in keys}, fetched
+
+    async def _hedged(self, attempt: Callable[[], Awaitable[Any]], latency: LatencyWindow) -> Any:
+        """First successful result of one attempt, plus a second if the first runs past p95"""
+        started = time.perf_counter()
+        first = asyncio.ensure_future(attempt())
+        pending = {first}
+        try:
+            if latency.value is not None:
+                await asyncio.wait(pending, timeout=max(latency.value, self.min_hedge_delay))
+                if not first.done():
+                    self.hedged += 1
+                    pending.add(asyncio.ensure_future(attempt()))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = None
+                for task in done:
+                    if task.exception() is None:
+                        winner = winner or task
+                    else:
+                        error = task.exception()
+                if winner is not None:
+                    self.hedge_wins += winner is not first
+                    latency.add(time.perf_counter() - started)
+                    return winner.result()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _failed(self):
+        self.failures += 1
+        self.breaker.record_failure()
+
+    def _remember(self, key: Hashable, value: Any):
+        self._last_good[key] = value
+        self._last_good.move_to_end(key)
+        if len(self._last_good) > self.cache_size:
+            self._last_good.popitem(last=False)
+
+    def _fall_back(self, key: Hashable) -> Any:
+        self.fallbacks += 1
+        value = self._last_good.get(key)
+        return value if value is not None else self.fallback(key)
+
+    def stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "failures": self.failures,
+            "short_circuited": self.short_circuited,
+            "fallbacks": self.fallbacks,
+            "circuit": self.breaker.state,
+            "circuit_trips": self.breaker.trips,
+            "p95_ms": round(self.latency.value * 1000, 2) if self.latency.value is not None else None
+        }
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+ARP SQLite Storage
+
+A local, service-free stand-in for the Postgres deployment. SQLiteStorage
+persists agents, transactions, ratings and delegations with the logical
+schema of fullstack/database/prisma/schema.prisma (snake_case columns as
+mapped there), so history queries run against indexes instead of
+scanning the engines' Python lists.
+
+Differences from the Prisma schema, kept deliberately small:
+
+- agent ids are wallet addresses, transaction ids are tx hashes
+- engines without Ethos data store their reputation as both the ARP and
+  the unified score
+- Decimal columns are REAL; scores keep their float value
+- a delegation row is keyed by (delegator, delegate, delegated_at), since
+  the engines allow repeated delegations between the same agents
+- event_logs and cache are left out (they belong to the chain indexer)
+
+Writes are buffered and flushed as executemany upserts in one
+transaction; every upsert is idempotent, so WAL replay can re-run them.
+"""
+
+import sqlite3
+from typing import Dict, List, Optional, Tuple, Union
+
+from arp_ids import iso_timestamp, parse_iso
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agents (
+    id                TEXT PRIMARY KEY,
+    wallet_address    TEXT NOT NULL UNIQUE,
+    name              TEXT NOT NULL,
+    description       TEXT,
+    avatar_url        TEXT,
+    arp_score         REAL NOT NULL DEFAULT 0,
+    ethos_score       REAL NOT NULL DEFAULT 0,
+    unified_score     REAL NOT NULL DEFAULT 0,
+    tier              TEXT NOT NULL DEFAULT 'NEWCOMER',
+    total_staked      REAL NOT NULL DEFAULT 0,
+    delegated_stake   REAL NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    rating_count      INTEGER NOT NULL DEFAULT 0,
+    average_rating    REAL NOT NULL DEFAULT 0,
+    is_verified       INTEGER NOT NULL DEFAULT 0,
+    is_active         INTEGER NOT NULL DEFAULT 1,
+    risk_score        INTEGER NOT NULL DEFAULT 50,
+    created_at        TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at        TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_active_at    TEXT
+);
+CREATE INDEX IF NOT EXISTS agents_unified_score_idx ON agents (unified_score DESC);
+CREATE INDEX IF NOT EXISTS agents_tier_idx ON agents (tier);
+CREATE INDEX IF NOT EXISTS agents_is_active_idx ON agents (is_active);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id              TEXT PRIMARY KEY,
+    tx_hash         TEXT NOT NULL UNIQUE,
+    from_agent_id   TEXT NOT NULL,
+    to_agent_id     TEXT NOT NULL,
+    amount          REAL NOT NULL,
+    currency        TEXT NOT NULL DEFAULT 'USDC',
+    status          TEXT NOT NULL DEFAULT 'PENDING',
+    block_number    INTEGER,
+    block_timestamp TEXT,
+    gas_used        INTEGER,
+    is_attested     INTEGER NOT NULL DEFAULT 0,
+    attested_at     TEXT,
+    created_at      TEXT NOT NULL,
+    updated_at      TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS transactions_from_agent_id_idx ON transactions (from_agent_id, created_at);
+CREATE INDEX IF NOT EXISTS transactions_to_agent_id_idx ON transactions (to_agent_id, created_at);
+CREATE INDEX IF NOT EXISTS transactions_status_idx ON transactions (status);
+CREATE INDEX IF NOT EXISTS transactions_created_at_idx ON transactions (created_at DESC);
+
+CREATE TABLE IF NOT EXISTS ratings (
+    id             TEXT PRIMARY KEY,
+    transaction_id TEXT NOT NULL UNIQUE,
+    from_agent_id  TEXT NOT NULL,
+    to_agent_id    TEXT NOT NULL,
+    score          INTEGER NOT NULL,
+    feedback       TEXT,
+    weight         REAL NOT NULL DEFAULT 1,
+    created_at     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ratings_to_agent_id_idx ON ratings (to_agent_id, created_at);
+CREATE INDEX IF NOT EXISTS ratings_from_agent_id_idx ON ratings (from_agent_id);
+CREATE INDEX IF NOT EXISTS ratings_score_idx ON ratings (score);
+
+CREATE TABLE IF NOT EXISTS delegations (
+    id             TEXT PRIMARY KEY,
+    delegator_id   TEXT NOT NULL,
+    delegate_id    TEXT NOT NULL,
+    amount         REAL NOT NULL,
+    is_active      INTEGER NOT NULL DEFAULT 1,
+    delegated_at   TEXT NOT NULL,
+    undelegated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS delegations_delegate_id_idx ON delegations (delegate_id);
+CREATE INDEX IF NOT EXISTS delegations_delegator_id_idx ON delegations (delegator_id);
+"""
+
+UPSERT_AGENT = """
+INSERT INTO agents (id, wallet_address, name, arp_score, unified_score, tier, total_staked,
+                    delegated_stake, transaction_count, rating_count, average_rating)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    name = excluded.name,
+    arp_score = excluded.arp_score,
+    unified_score = excluded.unified_score,
+    tier = excluded.tier,
+    total_staked = excluded.total_staked,
+    delegated_stake = excluded.delegated_stake,
+    transaction_count = excluded.transaction_count,
+    rating_count = excluded.rating_count,
+    average_rating = excluded.average_rating,
+    updated_at = CURRENT_TIMESTAMP
+"""
+
+UPSERT_TRANSACTION = """
+INSERT INTO transactions (id, tx_hash, from_agent_id, to_agent_id, amount, status,
+                          is_attested, attested_at, created_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    status = excluded.status,
+    is_attested = excluded.is_attested,
+    attested_at = excluded.attested_at,
+    updated_at = CURRENT_TIMESTAMP
+"""
+
+UPSERT_RATING = """
+INSERT INTO ratings (id, transaction_id, from_agent_id, to_agent_id, score, feedback, created_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO NOTHING
+"""
+
+UPSERT_DELEGATION = """
+INSERT INTO delegations (id, delegator_id, delegate_id, amount, delegated_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (id) DO NOTHING
+"""
+
+# Engine transaction status -> Prisma TransactionStatus
+TX_STATUS = {"pending": "PENDING", "completed": "ATTESTED"}
+ENGINE_TX_STATUS = {column: status for status, column in TX_STATUS.items()}
+
+def _iso(timestamp: Union[int, str, None]) -> Optional[str]:
+    """Engine timestamps are epoch nanoseconds; the columns hold fixed-width UTC ISO text
+
+    ISO input is normalized to the same form, so columns and query bounds
+    compare as text in time order.
+    """
+    if timestamp is None:
+        return None
+    return iso_timestamp(timestamp if isinstance(timestamp, int) else parse_iso(timestamp))
+
+def engine_transaction(row: Dict) -> Dict:
+    """A transactions table row in the engines' transaction dict shape"""
+    return {
+        "tx_hash": row["tx_hash"],
+        "from": row["from_agent_id"],
+        "to": row["to_agent_id"],
+        "amount": row["amount"],
+        "timestamp": parse_iso(row["created_at"]),
+        "status": ENGINE_TX_STATUS.get(row["status"], row["status"].lower())
+    }
+
+class SQLiteStorage:
+    """
+    SQLite storage backend for ARPProtocol and ARPContract.
+
+    save_* calls are queued (agents and transactions coalesce by id, so
+    the latest state wins) and written with executemany once batch_size
+    rows are pending, on flush(), or before any query reads.
+    """
+
+    def __init__(self, path: str = "arp.db", batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+        # sqlite3 keeps prepared statements for the fixed SQL strings above
+        self.conn = sqlite3.connect(path, cached_statements=64)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._agents: Dict[str, Tuple] = {}
+        self._transactions: Dict[str, Tuple] = {}
+        self._ratings: List[Tuple] = []
+        self._delegations: List[Tuple] = []
+        self._pending = 0
+
+    # === Writes ===
+    def _queued(self):
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def save_agent(self, agent):
+        """Queue an upsert of an agent's current scores and stats"""
+        average = agent.rating_sum / agent.rating_count if agent.rating_count else 0.0
+        self._agents[agent.address] = (
+            agent.address, agent.address, agent.name,
+            agent.reputation_score, agent.reputation_score,
+            agent.reputation_tier.split()[-1],
+            agent.staked_usdc, getattr(agent, "delegated_stake", 0.0),
+            agent.transactions_count, agent.rating_count, average
+        )
+        self._queued()
+
+    def save_transaction(self, tx: Dict, attested_at: Union[int, str, None] = None):
+        """Queue an upsert of an engine transaction dict"""
+        status = TX_STATUS.get(tx["status"], tx["status"].upper())
+        self._transactions[tx["tx_hash"]] = (
+            tx["tx_hash"], tx["tx_hash"], tx["from"], tx["to"], tx["amount"],
+            status, int(status == "ATTESTED"), _iso(attested_at), _iso(tx["timestamp"])
+        )
+        self._queued()
+
+    def save_rating(
+        self,
+        tx_hash: str,
+        rater: str,
+        rated: str,
+        score: int,
+        feedback: str,
+        created_at: Union[int, str]
+    ):
+        """Queue a rating of agent `rated` by `rater` (one per transaction)"""
+        self._ratings.append((tx_hash, tx_hash, rater, rated, score, feedback, _iso(created_at)))
+        self._queued()
+
+    def save_delegation(self, delegation: Dict):
+        """Queue an engine delegation dict ({from, to, amount, timestamp})"""
+        row_id = f"{delegation['from']}:{delegation['to']}:{delegation['timestamp']}"
+        self._delegations.append(
+            (row_id, delegation["from"], delegation["to"], delegation["amount"], _iso(delegation["timestamp"]))
+        )
+        self._queued()
+
+    def flush(self):
+        """Write every queued row in one transaction"""
+        if not self._pending:
+            return
+        with self.conn:
+            self.conn.executemany(UPSERT_AGENT, self._agents.values())
+            self.conn.executemany(UPSERT_TRANSACTION, self._transactions.values())
+            self.conn.executemany(UPSERT_RATING, self._ratings)
+            self.conn.executemany(UPSERT_DELEGATION, self._delegations)
+        self._agents.clear()
+        self._transactions.clear()
+        self._ratings.clear()
+        self._delegations.clear()
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    # === History queries ===
+    def _query(self, sql: str, params: Tuple) -> List[Dict]:
+        self.flush()
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def get_agent(self, address: str) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM agents WHERE id = ?", (address,))
+        return rows[0] if rows else None
+
+    def get_transaction(self, tx_hash: str) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM transactions WHERE tx_hash = ?", (tx_hash,))
+        return rows[0] if rows else None
+
+    def transaction_history(
+        self,
+        address: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Dict]:
+        """Transactions sent or received by an agent, newest first
+
+        since/until are ISO timestamps bounding created_at (inclusive), at
+        microsecond precision.
+        """
+        since = _iso(since) if since else ""
+        until = _iso(until) if until else "9999"
+        return self._query(
+            """
+            SELECT * FROM transactions
+            WHERE from_agent_id = ? AND created_at BETWEEN ? AND ?
+            UNION ALL
+            SELECT * FROM transactions
+            WHERE to_agent_id = ? AND from_agent_id != ? AND created_at BETWEEN ? AND ?
+            ORDER BY created_at DESC, tx_hash
+            LIMIT ? OFFSET ?
+            """,
+            (address, since, until, address, address, since, until, limit, offset)
+        )
+
+    def rating_history(self, address: str, limit: int = 50, offset: int = 0) -> List[Dict]:
+        """Ratings received by an agent, newest first"""
+        return self._query(
+            """
+            SELECT * FROM ratings WHERE to_agent_id = ?
+            ORDER BY created_at DESC, transaction_id
+            LIMIT ? OFFSET ?
+            """,
+            (address, limit, offset)
+        )
+
+    def delegation_history(self, address: str) -> List[Dict]:
+        """Delegations made by or to an agent, oldest first"""
+        return self._query(
+            """
+            SELECT * FROM delegations WHERE delegator_id = ? OR delegate_id = ?
+            ORDER BY delegated_at
+            """,
+            (address, address)
+        )
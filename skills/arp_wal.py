@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+ARP Write-Ahead Log
+
+Crash-safe persistence for protocol state:
+
+- WriteAheadLog: append-only file of length-prefixed, checksummed records
+  with group-commit fsync batching, bounded in time by a flush timer
+- save_snapshot / load_snapshot: compact compressed state snapshots that
+  record the last log sequence number (LSN) they include
+
+Recovery loads the latest snapshot and replays only the log records with
+a higher LSN.
+"""
+
+import json
+import numbers
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# length, crc32 of payload, lsn
+RECORD_HEADER = struct.Struct("<IIQ")
+SNAPSHOT_MAGIC = b"ARPSNAP1"
+SNAPSHOT_LSN = struct.Struct("<Q")
+
+class ReplayDivergedError(RuntimeError):
+    """Replaying a logged record did not reproduce the original call"""
+
+def _plain(value: Any) -> Any:
+    """JSON stand-in for argument types json has no encoding for"""
+    if isinstance(value, numbers.Number) and not isinstance(value, complex):
+        return float(value)  # e.g. Decimal amounts
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Cannot log {type(value).__name__} values")
+
+def _encode(record: Dict) -> bytes:
+    return json.dumps(record, separators=(",", ":"), default=_plain).encode()
+
+class WriteAheadLog:
+    """
+    Append-only record log with group commit.
+
+    Records are buffered and written + fsynced together once group_size
+    records are pending, or by a timer group_interval seconds after the
+    first of them, so a burst of writes pays for one fsync and a lone
+    write is durable within group_interval. flush() (and close()) force
+    the pending group out.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        group_size: int = 64,
+        group_interval: float = 0.01,
+        fsync: bool = True,
+        start_lsn: int = 0
+    ):
+        self.path = path
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.fsync = fsync
+        self.last_lsn = start_lsn
+        self._recover_tail()
+        self._file = open(path, "ab")
+        self._pending = []
+        self._lock = threading.RLock()  # The timer flushes from its own thread
+        self._timer: Optional[threading.Timer] = None
+        self.records_written = 0
+        self.syncs = 0
+
+    def append(self, record: Dict) -> int:
+        """Queue a record and return its LSN"""
+        payload = _encode(record)
+        with self._lock:
+            self.last_lsn += 1
+            self._pending.append(RECORD_HEADER.pack(len(payload), zlib.crc32(payload), self.last_lsn) + payload)
+            if len(self._pending) >= self.group_size or self.group_interval <= 0:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.group_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            return self.last_lsn
+
+    def flush(self):
+        """Write and fsync every pending record as one group"""
+        with self._lock:
+            if self._timer is not None:
+                if self._timer is not threading.current_thread():
+                    self._timer.cancel()
+                self._timer = None
+            if not self._pending or self._file.closed:
+                return
+            self._file.write(b"".join(self._pending))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+                self.syncs += 1
+            self.records_written += len(self._pending)
+            self._pending = []
+
+    def reset(self):
+        """Drop all records (after a snapshot has captured them); LSNs keep counting"""
+        with self._lock:
+            self.flush()
+            self._file.close()
+            self._file = open(self.path, "wb")
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._file.close()
+
+    @staticmethod
+    def read(path: str, after_lsn: int = 0) -> Iterator[Tuple[int, Dict]]:
+        """(lsn, record) pairs in order, stopping at a torn or corrupt tail"""
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    return
+                length, checksum, lsn = RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    return
+                if lsn > after_lsn:
+                    yield lsn, json.loads(payload)
+
+    def _recover_tail(self):
+        """Find the last LSN and cut off a torn final record so appends stay readable"""
+        if not os.path.exists(self.path):
+            return
+        valid = 0
+        with open(self.path, "rb") as f:
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+                length, checksum, lsn = RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                valid = f.tell()
+                self.last_lsn = max(self.last_lsn, lsn)
+        if valid < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid)
+
+def save_snapshot(path: str, state: Dict[str, Any], lsn: int, fsync: bool = True):
+    """Atomically write a compressed snapshot that covers records up to lsn"""
+    body = zlib.compress(_encode(state), 1)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(SNAPSHOT_LSN.pack(lsn))
+        f.write(body)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def load_snapshot(path: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+    """(lsn, state) from a snapshot file, or None if there is none"""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        lsn = _read_snapshot_header(f, path)
+        state = json.loads(zlib.decompress(f.read()))
+    return lsn, state
+
+def snapshot_lsn(path: str) -> int:
+    """LSN covered by a snapshot file (0 if there is none), without loading it"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as f:
+        return _read_snapshot_header(f, path)
+
+def _read_snapshot_header(f, path: str) -> int:
+    if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not an ARP snapshot")
+    return SNAPSHOT_LSN.unpack(f.read(SNAPSHOT_LSN.size))[0]
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+ARP Id and Timestamp Generation
+
+Hot-path helpers for transaction hashes, addresses and timestamps:
+
+- RandomIds: random hex ids drawn from a prefetched os.urandom buffer
+- CounterIds: sequential ids scrambled with a per-generator random seed,
+  unique per length until the counter wraps 16**length
+- now_ns / iso_timestamp / parse_iso: timestamps are kept as integer epoch
+  nanoseconds and formatted to ISO 8601 UTC only when serialized
+
+tx_hash() returns "0x" + 40 hex digits (20 bytes), the size of an
+address or packed rating hash (see arp_ratings.HASH_BYTES).
+"""
+
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+HASH_HEX_DIGITS = 40
+NS_PER_HOUR = 3600 * 1_000_000_000
+
+now_ns = time.time_ns
+
+def iso_timestamp(ns: int) -> str:
+    """Fixed-width ISO 8601 UTC time (microsecond precision) for epoch nanoseconds
+
+    Every output has the same width and offset, so the text sorts and
+    compares in time order.
+    """
+    seconds, rest = divmod(ns, 1_000_000_000)
+    moment = datetime.fromtimestamp(seconds, timezone.utc).replace(microsecond=rest // 1000)
+    return moment.isoformat(timespec="microseconds")
+
+def parse_iso(text: str) -> int:
+    """Epoch nanoseconds for an ISO 8601 timestamp (local time if it has no offset)"""
+    parsed = datetime.fromisoformat(text)
+    return int(parsed.replace(microsecond=0).timestamp()) * 1_000_000_000 + parsed.microsecond * 1000
+
+class IdGenerator(ABC):
+    """Source of hex ids; subclasses implement hex()"""
+
+    @abstractmethod
+    def hex(self, length: int) -> str:
+        """length lowercase hex digits"""
+
+    def tx_hash(self) -> str:
+        return "0x" + self.hex(HASH_HEX_DIGITS)
+
+    def tx_hashes(self, count: int) -> List[str]:
+        return [self.tx_hash() for _ in range(count)]
+
+class RandomIds(IdGenerator):
+    """Random ids, reading os.urandom in buffer_size chunks instead of per id"""
+
+    def __init__(self, buffer_size: int = 4096):
+        self.buffer_size = buffer_size
+        self._buffer = ""
+        self._pos = 0
+
+    def hex(self, length: int) -> str:
+        end = self._pos + length
+        if end > len(self._buffer):
+            self._buffer = self._buffer[self._pos:] + os.urandom(max(self.buffer_size, length)).hex()
+            self._pos, end = 0, length
+        digits = self._buffer[self._pos:end]
+        self._pos = end
+        return digits
+
+class CounterIds(IdGenerator):
+    """
+    Sequential ids: a Weyl sequence x += ODD (mod 16**length) per length,
+    starting from a random seed.
+
+    Adding an odd constant modulo a power of two visits every value before
+    repeating, so ids of one length never repeat within 16**length draws;
+    the random seed keeps separate runs from colliding.
+    """
+
+    ODD = 0x9E3779B97F4A7C15F39CC0605CEDC835  # Odd, bits spread over 128
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = int.from_bytes(os.urandom(HASH_HEX_DIGITS // 2), "big") if seed is None else seed
+        self._state: Dict[int, List[int]] = {}  # length -> [current value, mask]
+
+    def hex(self, length: int) -> str:
+        state = self._state.get(length)
+        if state is None:
+            mask = (1 << (4 * length)) - 1
+            state = self._state[length] = [self.seed & mask, mask]
+        value = state[0]
+        state[0] = (value + self.ODD) & state[1]
+        return format(value, f"0{length}x")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+ARP Memory-Mapped Agent Table
+
+A fixed-layout snapshot of the agent/score table that worker processes
+open read-only with mmap. Nothing is deserialized up front: rows are
+unpacked on access, and processes mapping the same file share its pages.
+
+File layout (little-endian):
+
+    header   magic, record size, row count, names offset, index offset
+    rows     one fixed-size record per agent, in agent_id order
+    names    UTF-8 agent names, referenced by (offset, length) from rows
+    index    u32 agent ids sorted by packed address, for binary search
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from typing import Dict, Iterable, Iterator, Optional
+
+from arp_ratings import HASH_BYTES, pack_hash, unpack_hash
+
+TABLE_MAGIC = b"ARPTBL01"
+HEADER = struct.Struct("<8sIQQQ")
+# agent_id, address length, address, tier code, staked, delegated, score,
+# rating sum, rating count, tx count, name offset, name length
+RECORD = struct.Struct(f"<IB{HASH_BYTES}sB6xdddqIIII")
+# Byte offset of the score within a record: the size of the fields before it
+SCORE_OFFSET = struct.calcsize(f"<IB{HASH_BYTES}sB6xdd")
+
+def write_agent_table(path: str, agents: Iterable) -> int:
+    """Write agents (in agent_id order) to a table file; returns the row count
+
+    Agents need the ARPProtocol Agent attributes; addresses must be
+    0x-prefixed hex of at most 20 bytes.
+    """
+    rows = bytearray()
+    names = bytearray()
+    addresses = []
+    for agent in agents:
+        raw = pack_hash(agent.address)
+        if raw is None:
+            raise ValueError(f"Address {agent.address!r} is not packable hex")
+        name = agent.name.encode()
+        rows += RECORD.pack(
+            agent.agent_id, len(raw), raw, agent.tier_code,
+            agent.staked_usdc, agent.delegated_stake, agent.reputation_score,
+            agent.rating_sum, agent.rating_count, agent.transactions_count,
+            len(names), len(name)
+        )
+        names += name
+        addresses.append((len(raw), raw.ljust(HASH_BYTES, b"\0")))
+    count = len(addresses)
+    index = array("I", sorted(range(count), key=lambda i: addresses[i]))
+    names_offset = HEADER.size + len(rows)
+    index_offset = names_offset + len(names)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(TABLE_MAGIC, RECORD.size, count, names_offset, index_offset))
+        f.write(rows)
+        f.write(names)
+        f.write(index.tobytes())
+    os.replace(tmp_path, path)
+    return count
+
+class AgentTable:
+    """Read-only, zero-copy view of an agent table file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, record_size, self._count, self._names_offset, self._index_offset = HEADER.unpack_from(self._mm)
+        if magic != TABLE_MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a compatible ARP agent table")
+        self._index = memoryview(self._mm)[self._index_offset:self._index_offset + 4 * self._count].cast("I")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> "AgentTable":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._index.release()
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+
+    def _offset(self, agent_id: int) -> int:
+        if not 0 <= agent_id < self._count:
+            raise IndexError("agent id out of range")
+        return HEADER.size + agent_id * RECORD.size
+
+    def row(self, agent_id: int) -> Dict:
+        (agent_id, length, raw, tier_code, staked, delegated, score,
+         rating_sum, rating_count, tx_count, name_offset, name_length) = RECORD.unpack_from(self._mm, self._offset(agent_id))
+        start = self._names_offset + name_offset
+        return {
+            "agent_id": agent_id,
+            "address": unpack_hash(raw[:length]),
+            "name": self._mm[start:start + name_length].decode(),
+            "staked_usdc": staked,
+            "delegated_stake": delegated,
+            "reputation_score": score,
+            "tier_code": tier_code,
+            "rating_sum": rating_sum,
+            "rating_count": rating_count,
+            "transactions_count": tx_count
+        }
+
+    def score(self, agent_id: int) -> float:
+        return struct.unpack_from("<d", self._mm, self._offset(agent_id) + SCORE_OFFSET)[0]
+
+    def _address_key(self, agent_id: int) -> bytes:
+        offset = self._offset(agent_id) + 4
+        return self._mm[offset:offset + 1 + HASH_BYTES]
+
+    def find(self, address: str) -> Optional[int]:
+        """agent_id for an address by binary search over the sorted index"""
+        raw = pack_hash(address)
+        if raw is None:
+            return None
+        key = bytes([len(raw)]) + raw.ljust(HASH_BYTES, b"\0")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._address_key(self._index[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._address_key(self._index[lo]) == key:
+            return self._index[lo]
+        return None
+
+    def get(self, address: str) -> Optional[Dict]:
+        agent_id = self.find(address)
+        return self.row(agent_id) if agent_id is not None else None
+
+    def __iter__(self) -> Iterator[Dict]:
+        for agent_id in range(self._count):
+            yield self.row(agent_id)
+
+    def as_numpy(self):
+        """Structured NumPy array over the rows, sharing the mapped pages (drop it before close())"""
+        import numpy as np
+        dtype = np.dtype({
+            "names": ["agent_id", "address_len", "address", "tier_code", "staked_usdc",
+                      "delegated_stake", "reputation_score", "rating_sum", "rating_count",
+                      "transactions_count", "name_offset", "name_length"],
+            "formats": ["<u4", "u1", f"S{HASH_BYTES}", "u1", "<f8", "<f8", "<f8", "<i8",
+                        "<u4", "<u4", "<u4", "<u4"],
+            "offsets": [0, 4, 5, 25, 32, 40, 48, 56, 64, 68, 72, 76],
+            "itemsize": RECORD.size
+        })
+        return np.frombuffer(self._mm, dtype=dtype, count=self._count, offset=HEADER.size)
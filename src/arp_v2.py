@@ -11,15 +11,28 @@ New Features in v2.0:
 - Slash Councils (community governance for disputes)
 """
 
+import functools
 import json
+import os
 import random
-import uuid
+import sys
 import time
+from contextlib import nullcontext
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional, Dict, Any, Tuple
 from enum import Enum
-from collections import defaultdict
+from collections import defaultdict, deque
+
+import arp_batch
+from arp_cache import AgentCache
+from arp_export import FORMATS, PayloadCache, export_records
+from arp_ids import NS_PER_HOUR, IdGenerator, RandomIds, now_ns, parse_iso
+from arp_index import ExpiryQueue, LeaderboardIndex, WeightedSampler
+from arp_mmap import AgentTable, write_agent_table
+from arp_ratings import RatingStore, RetentionPolicy, valid_rating
+from arp_storage import SQLiteStorage, engine_transaction
+from arp_wal import ReplayDivergedError, WriteAheadLog, load_snapshot, save_snapshot, snapshot_lsn
 
 class AttestationType(Enum):
     COMPLETED = "completed"
@@ -34,73 +47,349 @@ class ReputationTier(Enum):
     ELITE = (100, 200, "🌟")
     LEGENDARY = (200, float('inf'), "👑")
 
-@dataclass
+# Tier boundary table: a score's tier code is the number of bounds at or
+# below it, found by binary search; labels are only rendered on output
+TIER_BOUNDS = [tier.value[0] for tier in list(ReputationTier)[1:]]
+TIER_LABELS = [f"{tier.value[2]} {tier.name}" for tier in ReputationTier]
+
+# Reputation formula weights, shared by Agent.calculate_reputation and
+# ARPProtocol.rescore_all
+RATING_WEIGHT = 20
+STAKE_WEIGHT = 0.1
+TX_WEIGHT = 2
+ORACLE_WEIGHT = 5
+COUNCIL_WEIGHT = 3
+
+@dataclass(slots=True)
 class Agent:
     """An agent in the reputation system"""
     name: str
     address: str
+    agent_id: int = -1  # Dense integer id assigned at registration
     staked_usdc: float = 0.0
     delegated_stake: float = 0.0  # NEW: Staked by others
     transactions_count: int = 0
-    ratings: List[Dict] = field(default_factory=list)
+    ratings: RatingStore = field(default_factory=RatingStore)
     reputation_score: float = 0.0
-    reputation_tier: str = "🆕 NEWCOMER"
+    tier_code: int = 0  # Index into TIER_LABELS
     nft_id: Optional[str] = None  # NEW: Reputation NFT
     oracles_trusted: List[str] = field(default_factory=list)  # NEW: Oracles
     council_votes: int = 0  # NEW: Council participation
+    rating_sum: int = 0  # Running aggregates so scoring is O(1) per update
+    rating_count: int = 0
+    
+    def add_rating(self, rating: int, tx_hash: str, feedback: str = "", at: Optional[float] = None):
+        """Record a rating and update the running aggregates"""
+        self.ratings.add(rating, tx_hash, feedback, at)
+        self.rating_sum += rating
+        self.rating_count += 1
+    
+    def verify_reputation(self) -> Dict:
+        """Recompute rating aggregates from scratch, report drift and resync them
+        
+        The score is left alone; ARPProtocol.verify_reputation rescores it.
+        """
+        expected_sum = self.ratings.total()
+        expected_count = self.ratings.count()
+        ok = expected_sum == self.rating_sum and expected_count == self.rating_count
+        result = {
+            "ok": ok,
+            "rating_sum": self.rating_sum,
+            "rating_count": self.rating_count,
+            "expected_sum": expected_sum,
+            "expected_count": expected_count
+        }
+        if not ok:
+            self.rating_sum = expected_sum
+            self.rating_count = expected_count
+        return result
     
     def calculate_reputation(self):
         """Calculate reputation score with all factors"""
-        if not self.ratings:
+        if not self.rating_count:
             self.reputation_score = 0.0
         else:
-            avg_rating = sum(r["rating"] for r in self.ratings) / len(self.ratings)
-            stake_bonus = (self.staked_usdc + self.delegated_stake) * 0.1  # NEW: Include delegated
-            tx_bonus = self.transactions_count * 2
-            oracle_bonus = len(self.oracles_trusted) * 5  # NEW: Oracle trust bonus
-            council_bonus = self.council_votes * 3  # NEW: Council participation bonus
+            avg_rating = self.rating_sum / self.rating_count
+            stake_bonus = (self.staked_usdc + self.delegated_stake) * STAKE_WEIGHT  # NEW: Include delegated
+            tx_bonus = self.transactions_count * TX_WEIGHT
+            oracle_bonus = len(self.oracles_trusted) * ORACLE_WEIGHT  # NEW: Oracle trust bonus
+            council_bonus = self.council_votes * COUNCIL_WEIGHT  # NEW: Council participation bonus
             
             self.reputation_score = (
-                (avg_rating * 20) + 
+                (avg_rating * RATING_WEIGHT) + 
                 stake_bonus + 
                 tx_bonus + 
                 oracle_bonus + 
                 council_bonus
             )
         
-        for tier in ReputationTier:
-            min_score, max_score, emoji = tier.value
-            if min_score <= self.reputation_score < max_score:
-                self.reputation_tier = f"{emoji} {tier.name}"
-                break
-        
+        self.tier_code = bisect_right(TIER_BOUNDS, self.reputation_score)
         return self.reputation_score
+    
+    @property
+    def reputation_tier(self) -> str:
+        """Tier label, rendered from the tier code on read"""
+        return TIER_LABELS[self.tier_code]
+    
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "address": self.address[:20] + "...",
+            "staked_usdc": self.staked_usdc,
+            "delegated_stake": self.delegated_stake,
+            "reputation_score": round(self.reputation_score, 1),
+            "reputation_tier": self.reputation_tier,
+            "transactions": self.transactions_count,
+            "ratings_count": self.rating_count
+        }
+    
+    def to_state(self) -> Dict:
+        """Full agent state for snapshots and tiering, scores as last computed"""
+        return {
+            "name": self.name,
+            "address": self.address,
+            "agent_id": self.agent_id,
+            "reputation_score": self.reputation_score,
+            "tier_code": self.tier_code,
+            "staked_usdc": self.staked_usdc,
+            "delegated_stake": self.delegated_stake,
+            "transactions_count": self.transactions_count,
+            "ratings": [[r["rating"], r["tx_hash"], r["feedback"], r["time"]] for r in self.ratings],
+            "rating_buckets": self.ratings.buckets(),
+            "nft_id": self.nft_id,
+            "oracles_trusted": self.oracles_trusted,
+            "council_votes": self.council_votes
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict) -> "Agent":
+        state = dict(state)
+        ratings = state.pop("ratings")
+        buckets = state.pop("rating_buckets", [])
+        agent = cls(**state)
+        agent.address = sys.intern(agent.address)
+        for rating, tx_hash, feedback, *at in ratings:
+            agent.add_rating(rating, tx_hash, feedback, *at)
+        agent.ratings.restore_buckets(buckets)
+        agent.rating_sum += sum(total for _, total, _ in buckets)
+        agent.rating_count += sum(count for _, _, count in buckets)
+        return agent
+    
+    def nbytes(self) -> int:
+        """Approximate resident bytes (the interned address is shared)"""
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.name)
+            + sys.getsizeof(self.oracles_trusted)
+            + self.ratings.nbytes()
+        )
+
+def journaled(method):
+    """Record a state-changing ARPProtocol call in its write-ahead log
+    
+    The record holds the call's arguments plus every id, timestamp and
+    random draw it made (see ARPProtocol._draw), so replay is exact. A call
+    that raised also records the exception type, which replay must raise.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.wal is None or self._draws is not None or self._replay is not None:
+            with self._holding_agents():
+                return method(self, *args, **kwargs)
+        # Materialize one-shot iterators (e.g. generators of batch events) so they can be logged
+        args = [list(a) if isinstance(a, Iterator) else a for a in args]
+        kwargs = {k: list(v) if isinstance(v, Iterator) else v for k, v in kwargs.items()}
+        self._draws = []
+        error = None
+        try:
+            with self._holding_agents():
+                return method(self, *args, **kwargs)
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            draws, self._draws = self._draws, None
+            record = {"op": method.__name__, "args": args, "kwargs": kwargs, "draws": draws}
+            if error is not None:
+                record["error"] = error
+            self.wal.append(record)
+            self._ops_since_snapshot += 1
+            if self.snapshot_every and self._ops_since_snapshot >= self.snapshot_every:
+                self.checkpoint()
+    return wrapper
 
 class ARPProtocol:
     """Enhanced ARP Protocol with all v2.0 features"""
     
-    def __init__(self):
+    WAL_FILE = "arp.wal"
+    SNAPSHOT_FILE = "arp.snapshot"
+    AGENT_TABLE_FILE = "arp.agents"
+    
+    def __init__(
+        self,
+        council_ttl_hours: float = 72.0,
+        expiry_batch_size: int = 100,
+        storage: Optional[SQLiteStorage] = None,
+        rating_retention: Optional[RetentionPolicy] = None,
+        ids: Optional[IdGenerator] = None,
+        lazy_scoring: bool = False
+    ):
         self.agents: Dict[str, Agent] = {}
-        self.transactions: List[Dict] = []
+        self.agent_ids: List[str] = []  # agent_id -> address
+        self.transactions: Dict[str, Dict] = {}  # tx_hash -> tx, in submission order
         self.attestations: List[Dict] = []
         self.delegations: List[Dict] = []  # NEW: Delegated stakes
-        self.oracles: Dict[str, Agent] = {}  # NEW: Reputation Oracles
+        self.oracles: Dict[str, str] = {}  # NEW: Reputation Oracles (address -> name)
         self.markets: Dict[str, Dict] = {}  # NEW: Prediction Markets
         self.nfts: Dict[str, Dict] = {}  # NEW: Reputation NFTs
-        self.council_cases: List[Dict] = []  # NEW: Slash Councils
-        
+        self.council_cases: Dict[str, Dict] = {}  # NEW: Slash Councils
+        self.slashing_events: List[Dict] = []  # Direct and council slashes, for export
+        self.leaderboard = LeaderboardIndex()  # Kept in sync by _rescore
+        self.leaderboard_version = 0  # Bumped whenever leaderboard rows may change
+        self.leaderboard_pages = PayloadCache()  # Encoded pages, valid for one version
+        self.juror_stakes = WeightedSampler()  # Total stake per agent, for juror draws
+        self.expiries = ExpiryQueue()  # Market and council case deadlines, in epoch ns
+        self.council_ttl_hours = council_ttl_hours
+        self.expiry_batch_size = expiry_batch_size
+        # Persistence (see enable_persistence / recover)
+        self.wal: Optional[WriteAheadLog] = None
+        self.persist_dir: Optional[str] = None
+        self.snapshot_every = 0
+        self._ops_since_snapshot = 0
+        self._draws: Optional[List] = None  # Values drawn by the journaled call in progress
+        self._replay: Optional[deque] = None  # Recorded values fed back during replay
+        self.agent_table: Optional[AgentTable] = None  # Read-only mmap table (see open_agent_table)
+        self.storage = storage  # Optional queryable history store (see arp_storage)
+        self.rating_retention = rating_retention  # Applied to every agent's RatingStore
+        self.ids = ids or RandomIds()  # Source of addresses, hashes and ids (see arp_ids)
+        # Lazy scoring: mutations only mark agents dirty; reads and flush_scores() score them
+        self.lazy_scoring = lazy_scoring
+        self._dirty: Dict[str, None] = {}  # Insertion-ordered set of addresses
+        self.agent_cache: Optional[AgentCache] = None  # Set by enable_tiering; then self.agents
+        
+    def _draw(self, make: Callable[[], Any]) -> Any:
+        """Produce an id, timestamp or other nondeterministic value
+        
+        Inside a journaled call the value is recorded with it; during WAL
+        replay the recorded value is returned instead of a fresh one.
+        """
+        if self._replay is not None:
+            if not self._replay:
+                raise ReplayDivergedError("WAL replay diverged: no recorded value left")
+            return self._replay.popleft()
+        value = make()
+        if self._draws is not None:
+            self._draws.append(value)
+        return value
+    
+    def _hex(self, length: int) -> str:
+        return self._draw(lambda: self.ids.hex(length))
+    
+    def _tx_hash(self) -> str:
+        return self._draw(self.ids.tx_hash)
+    
+    def _timestamp(self) -> int:
+        """Epoch nanoseconds (formatted with arp_ids.iso_timestamp on output)"""
+        return self._draw(now_ns)
+    
+    def _time(self) -> float:
+        """Epoch seconds, the resolution RatingStore keeps rating times at"""
+        return self._draw(time.time)
+    
+    def _holding_agents(self):
+        """Pin agents touched by the current operation until it finishes"""
+        return self.agent_cache.hold() if self.agent_cache is not None else nullcontext()
+    
+    def enable_tiering(self, path: str, byte_budget: int = 64 * 1024 * 1024) -> AgentCache:
+        """Keep at most byte_budget of agents in memory, paging the rest to path
+        
+        self.agents becomes an AgentCache: cold agents are faulted back in
+        on access. Agent objects held across operations may be paged out
+        and replaced, so re-fetch them with get_agent().
+        """
+        cache = AgentCache(
+            path,
+            byte_budget,
+            encode=Agent.to_state,
+            decode=self._thaw_agent,
+            size_of=Agent.nbytes
+        )
+        for address, agent in self.agents.items():
+            cache[address] = agent
+        self.agents = cache
+        self.agent_cache = cache
+        return cache
+    
+    def _thaw_agent(self, state: Dict) -> Agent:
+        """Page an agent back in with its stored score, which the leaderboard indexes"""
+        agent = Agent.from_state(state)
+        agent.ratings.retention = self.rating_retention
+        return agent
+    
+    def get_cache_stats(self) -> Optional[Dict]:
+        """Hot-set hit/miss/eviction counters, or None without tiering"""
+        return self.agent_cache.stats() if self.agent_cache is not None else None
+    
+    def _rescore(self, agent: Agent):
+        """Recalculate an agent's reputation, or mark it dirty in lazy mode"""
+        if self.lazy_scoring:
+            self._dirty[agent.address] = None
+        else:
+            self._score_now(agent)
+    
+    def _fresh(self, agent: Agent) -> Agent:
+        """The agent with its score brought up to date (lazy mode)"""
+        if agent.address in self._dirty:
+            del self._dirty[agent.address]
+            self._score_now(agent)
+        return agent
+    
+    def flush_scores(self) -> int:
+        """Score every dirty agent once; returns how many were scored"""
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, {}
+        for address in dirty:
+            if address in self.agents:
+                self._score_now(self.agents[address])
+        return len(dirty)
+    
+    def _score_now(self, agent: Agent) -> float:
+        """Recalculate an agent's reputation and refresh the leaderboard"""
+        score = agent.calculate_reputation()
+        self.leaderboard.update(agent.address, score)
+        self.leaderboard_version += 1
+        self.juror_stakes.set(agent.address, agent.staked_usdc + agent.delegated_stake)
+        if self.storage is not None:
+            self.storage.save_agent(agent)
+        return score
+    
+    def _store_attestation(self, tx: Dict, attestation: Dict):
+        """Mirror an attested transaction and its rating into storage"""
+        self.storage.save_transaction(tx, attested_at=attestation["timestamp"])
+        # The rating lands on the transaction's sender, given by its counterparty
+        self.storage.save_rating(
+            tx["tx_hash"], tx["to"], tx["from"], attestation["rating"],
+            attestation["feedback"], attestation["timestamp"]
+        )
+    
+    @journaled
     def register_agent(self, name: str, staked_usdc: float = 10.0) -> Agent:
         """Register a new agent"""
         agent = Agent(
             name=name,
-            address=f"0x{uuid.uuid4().hex[:40]}",
-            staked_usdc=staked_usdc
+            address=sys.intern(self._tx_hash()),
+            agent_id=len(self.agent_ids),
+            staked_usdc=staked_usdc,
+            ratings=RatingStore(retention=self.rating_retention)
         )
-        agent.calculate_reputation()
+        self.agent_ids.append(agent.address)
         self.agents[agent.address] = agent
+        self._rescore(agent)
         return agent
     
     # === NEW FEATURE 1: Delegated Staking ===
+    @journaled
     def delegate_stake(self, from_agent: str, to_agent: str, amount: float) -> Dict:
         """Stake USDC on behalf of another agent"""
         if from_agent not in self.agents:
@@ -111,81 +400,96 @@ class ARPProtocol:
         
         self.agents[from_agent].staked_usdc -= amount
         self.agents[to_agent].delegated_stake += amount
-        self.agents[to_agent].calculate_reputation()
+        self._rescore(self.agents[from_agent])
+        self._rescore(self.agents[to_agent])
         
         delegation = {
             "from": from_agent,
             "to": to_agent,
             "amount": amount,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": self._timestamp()
         }
         self.delegations.append(delegation)
+        if self.storage is not None:
+            self.storage.save_delegation(delegation)
         
         return {
             "success": True,
             "delegation": delegation,
-            "new_reputation": self.agents[to_agent].reputation_score
+            "new_reputation": self._fresh(self.agents[to_agent]).reputation_score
         }
     
     # === NEW FEATURE 2: Reputation Oracles ===
+    @journaled
     def register_oracle(self, agent_address: str) -> Dict:
         """Register an agent as a reputation oracle"""
         if agent_address not in self.agents:
             return {"error": "Agent not found"}
         
-        agent = self.agents[agent_address]
+        agent = self._fresh(self.agents[agent_address])
         if agent.reputation_score < 100:
             return {"error": "Need ELITE tier to be oracle"}
         
-        self.oracles[agent_address] = agent
+        self.oracles[agent_address] = agent.name
         agent.oracles_trusted.append(agent_address)
         return {"success": True, "oracle": agent.name}
     
+    @journaled
     def oracle_attest(self, oracle: str, target: str, rating: int, evidence: str) -> Dict:
         """Oracle submits weighted attestation"""
         if oracle not in self.oracles:
             return {"error": "Not a registered oracle"}
+        if not valid_rating(rating * 2):
+            return {"error": "Rating out of range"}
         
         # Oracle ratings are worth 2x
         attestation = {
-            "tx_hash": f"ORACLE-{uuid.uuid4().hex[:16]}",
+            "tx_hash": f"ORACLE-{self._hex(16)}",
             "from": oracle,
             "to": target,
             "rating": rating * 2,  # Oracle bonus
             "feedback": f"[ORACLE] {evidence}",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._timestamp(),
             "type": "oracle"
         }
         
         self.attestations.append(attestation)
+        if self.storage is not None:
+            self.storage.save_rating(
+                attestation["tx_hash"], oracle, target, attestation["rating"],
+                attestation["feedback"], attestation["timestamp"]
+            )
         if target in self.agents:
-            self.agents[target].ratings.append({
-                "rating": rating * 2,
-                "tx_hash": attestation["tx_hash"],
-                "feedback": attestation["feedback"]
-            })
-            self.agents[target].calculate_reputation()
+            self.agents[target].add_rating(rating * 2, attestation["tx_hash"], attestation["feedback"], self._time())
+            self._rescore(self.agents[target])
         
         return {"success": True, "attestation": attestation}
     
     # === NEW FEATURE 3: Reputation Markets ===
+    @journaled
     def create_market(self, target_agent: str, description: str, duration_hours: int = 24) -> Dict:
         """Create a prediction market on agent's reputation"""
-        market_id = f"MARKET-{uuid.uuid4().hex[:8]}"
+        self.process_expirations(batch_size=self.expiry_batch_size)
+        market_id = f"MARKET-{self._hex(8)}"
+        created_at = self._timestamp()
+        expires_at = created_at + int(duration_hours * NS_PER_HOUR)
         market = {
             "id": market_id,
             "target_agent": target_agent,
             "description": description,
             "duration_hours": duration_hours,
-            "created_at": datetime.now().isoformat(),
+            "created_at": created_at,
+            "expires_at": expires_at,
             "yes_bets": [],
             "no_bets": [],
             "resolved": False,
             "outcome": None
         }
         self.markets[market_id] = market
+        self.expiries.schedule(expires_at, "market", market_id)
         return {"success": True, "market": market}
     
+    @journaled
     def bet_on_market(self, market_id: str, bettor: str, amount: float, bet_yes: bool) -> Dict:
         """Bet on market outcome"""
         if market_id not in self.markets:
@@ -195,6 +499,9 @@ class ARPProtocol:
         if market["resolved"]:
             return {"error": "Market already resolved"}
         
+        if self._timestamp() >= market["expires_at"]:
+            return {"error": "Market expired"}
+        
         if bettor not in self.agents:
             return {"error": "Agent not found"}
         
@@ -202,7 +509,7 @@ class ARPProtocol:
             "bettor": bettor,
             "amount": amount,
             "side": "YES" if bet_yes else "NO",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": self._timestamp()
         }
         
         if bet_yes:
@@ -212,12 +519,15 @@ class ARPProtocol:
         
         return {"success": True, "bet": bet}
     
+    @journaled
     def resolve_market(self, market_id: str, outcome: bool) -> Dict:
         """Resolve market and distribute rewards"""
         if market_id not in self.markets:
             return {"error": "Market not found"}
         
         market = self.markets[market_id]
+        if market["resolved"]:
+            return {"error": "Market already resolved"}
         market["resolved"] = True
         market["outcome"] = outcome
         
@@ -237,14 +547,61 @@ class ARPProtocol:
         
         return {"success": True, "outcome": outcome, "payouts": results}
     
+    def _expire_market(self, market: Dict) -> Dict:
+        """Close a market that reached its deadline and refund every bet
+        
+        The refunds are recorded on the market as well as returned.
+        """
+        market["resolved"] = True
+        market["outcome"] = None
+        market["expired"] = True
+        market["refunds"] = [
+            {"bettor": bet["bettor"], "refund": bet["amount"]}
+            for bet in market["yes_bets"] + market["no_bets"]
+        ]
+        return {"success": True, "outcome": None, "refunds": market["refunds"]}
+    
+    # === Expiry scheduling ===
+    @journaled
+    def process_expirations(self, now: Optional[int] = None, batch_size: Optional[int] = None) -> Dict:
+        """Auto-resolve expired markets and close stale council cases
+        
+        Runs at most batch_size due items per call; create_market and
+        create_council_case call it so deadlines are enforced as you go.
+        Refunds from expired markets are returned, keyed by market id.
+        now and every deadline are epoch nanoseconds, like created_at.
+        """
+        now = self._timestamp() if now is None else now
+        markets_resolved = 0
+        refunds = {}
+        cases_closed = 0
+        for kind, item_id in self.expiries.pop_due(now, batch_size):
+            if kind == "market":
+                market = self.markets.get(item_id)
+                if market and not market["resolved"]:
+                    refunds[item_id] = self._expire_market(market)["refunds"]
+                    markets_resolved += 1
+            elif kind == "council":
+                case = self.council_cases.get(item_id)
+                if case and not case["resolved"]:
+                    self.resolve_council_case(item_id)
+                    cases_closed += 1
+        return {
+            "markets_resolved": markets_resolved,
+            "refunds": refunds,
+            "cases_closed": cases_closed,
+            "pending": len(self.expiries)
+        }
+    
     # === NEW FEATURE 4: Reputation NFTs ===
+    @journaled
     def mint_reputation_nft(self, agent_address: str) -> Dict:
         """Mint reputation as NFT (transferable)"""
         if agent_address not in self.agents:
             return {"error": "Agent not found"}
         
-        agent = self.agents[agent_address]
-        nft_id = f"ARP-NFT-{uuid.uuid4().hex[:12]}"
+        agent = self._fresh(self.agents[agent_address])
+        nft_id = f"ARP-NFT-{self._hex(12)}"
         
         nft = {
             "id": nft_id,
@@ -252,7 +609,7 @@ class ARPProtocol:
             "agent_name": agent.name,
             "reputation_score": agent.reputation_score,
             "tier": agent.reputation_tier,
-            "minted_at": datetime.now().isoformat(),
+            "minted_at": self._timestamp(),
             "owner": agent_address
         }
         
@@ -261,6 +618,7 @@ class ARPProtocol:
         
         return {"success": True, "nft": nft}
     
+    @journaled
     def transfer_nft(self, nft_id: str, new_owner: str) -> Dict:
         """Transfer reputation NFT"""
         if nft_id not in self.nfts:
@@ -269,19 +627,36 @@ class ARPProtocol:
         nft = self.nfts[nft_id]
         old_owner = nft["owner"]
         nft["owner"] = new_owner
-        nft["transferred_at"] = datetime.now().isoformat()
+        nft["transferred_at"] = self._timestamp()
         
         return {"success": True, "nft": nft, "from": old_owner, "to": new_owner}
     
     # === NEW FEATURE 5: Slash Councils ===
-    def create_council_case(self, target: str, evidence: str, accuser: str) -> Dict:
-        """Create a council case for disputed slashing"""
+    @journaled
+    def create_council_case(
+        self,
+        target: str,
+        evidence: str,
+        accuser: str,
+        juror_count: int = 5,
+        stake_weighted: bool = False
+    ) -> Dict:
+        """Create a council case for disputed slashing
+        
+        Jurors are the top agents by reputation, or with stake_weighted=True
+        a random draw weighted by each agent's own plus delegated stake.
+        """
+        self.process_expirations(batch_size=self.expiry_batch_size)
+        case_id = f"COUNCIL-{self._hex(8)}"
+        created_at = self._timestamp()
+        expires_at = created_at + int(self.council_ttl_hours * NS_PER_HOUR)
         case = {
-            "id": f"COUNCIL-{uuid.uuid4().hex[:8]}",
+            "id": case_id,
             "target": target,
             "evidence": evidence,
             "accuser": accuser,
-            "created_at": datetime.now().isoformat(),
+            "created_at": created_at,
+            "expires_at": expires_at,
             "votes_for": [],
             "votes_against": [],
             "jurors": [],
@@ -289,24 +664,33 @@ class ARPProtocol:
             "verdict": None
         }
         
-        # Add eligible jurors (top 5 agents)
-        eligible = sorted(
-            [a for a in self.agents.values() if a.address != target],
-            key=lambda x: x.reputation_score,
-            reverse=True
-        )[:5]
-        
-        case["jurors"] = [a.address for a in eligible]
-        self.council_cases.append(case)
+        self.flush_scores()
+        if stake_weighted:
+            case["jurors"] = self._draw(lambda: self.juror_stakes.sample(juror_count, exclude=[target]))
+        else:
+            # Top agents from the leaderboard, skipping the target
+            case["jurors"] = [
+                address for address, _ in self.leaderboard.top(juror_count + 1)
+                if address != target
+            ][:juror_count]
+        self.council_cases[case["id"]] = case
+        self.expiries.schedule(expires_at, "council", case["id"])
         
         return {"success": True, "case": case}
     
+    @journaled
     def council_vote(self, case_id: str, juror: str, vote_guilty: bool) -> Dict:
         """Vote on council case"""
-        case = next((c for c in self.council_cases if c["id"] == case_id), None)
+        case = self.council_cases.get(case_id)
         if not case:
             return {"error": "Case not found"}
         
+        if case["resolved"]:
+            return {"error": "Case already resolved"}
+        
+        if self._timestamp() >= case["expires_at"]:
+            return {"error": "Case expired"}
+        
         if juror not in case["jurors"]:
             return {"error": "Not an eligible juror"}
         
@@ -318,13 +702,14 @@ class ARPProtocol:
         # Update juror stats
         if juror in self.agents:
             self.agents[juror].council_votes += 1
-            self.agents[juror].calculate_reputation()
+            self._rescore(self.agents[juror])
         
         return {"success": True, "votes": len(case["votes_for"]), "against": len(case["votes_against"])}
     
+    @journaled
     def resolve_council_case(self, case_id: str) -> Dict:
         """Resolve council case"""
-        case = next((c for c in self.council_cases if c["id"] == case_id), None)
+        case = self.council_cases.get(case_id)
         if not case:
             return {"error": "Case not found"}
         
@@ -337,37 +722,49 @@ class ARPProtocol:
             target = self.agents[case["target"]]
             slash_amount = target.staked_usdc * 0.5
             target.staked_usdc -= slash_amount
-            target.ratings.append({
-                "rating": 1,
-                "tx_hash": f"COUNCIL-SLASH-{case['id']}",
-                "feedback": f"Council verdict: Guilty"
+            target.add_rating(1, f"COUNCIL-SLASH-{case['id']}", "Council verdict: Guilty", self._time())
+            self._rescore(target)
+            self.slashing_events.append({
+                "address": target.address,
+                "amount": slash_amount,
+                "reason": f"Council verdict: Guilty ({case['id']})",
+                "source": "council",
+                "timestamp": self._timestamp()
             })
-            target.calculate_reputation()
             return {"success": True, "verdict": "guilty", "slashed": slash_amount}
         
         return {"success": True, "verdict": "not_guilty"}
     
     # === Original Functions ===
+    @journaled
     def submit_transaction(self, from_addr: str, to_addr: str, amount: float) -> Dict:
         tx = {
-            "tx_hash": f"0x{uuid.uuid4().hex[:40]}",
+            "tx_hash": self._tx_hash(),
             "from": from_addr,
             "to": to_addr,
             "amount": amount,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._timestamp(),
             "status": "pending"
         }
-        self.transactions.append(tx)
-        if from_addr in self.agents:
-            self.agents[from_addr].transactions_count += 1
-        if to_addr in self.agents:
-            self.agents[to_addr].transactions_count += 1
+        self.transactions[tx["tx_hash"]] = tx
+        if self.storage is not None:
+            self.storage.save_transaction(tx)
+        # The transaction count is part of the score, so both parties are rescored
+        for addr in (from_addr, to_addr):
+            if addr in self.agents:
+                self.agents[addr].transactions_count += 1
+                self._rescore(self.agents[addr])
         return tx
     
+    @journaled
     def attest(self, tx_hash: str, rating: int, feedback: str = "") -> Dict:
-        tx = next((t for t in self.transactions if t["tx_hash"] == tx_hash), None)
+        tx = self.transactions.get(tx_hash)
         if not tx:
             return {"error": "Transaction not found"}
+        if tx["status"] == "completed":
+            return {"error": "Transaction already attested"}
+        if not valid_rating(rating):
+            return {"error": "Rating out of range"}
         
         tx["status"] = "completed"
         attestation = {
@@ -376,20 +773,107 @@ class ARPProtocol:
             "to": tx["to"],
             "rating": rating,
             "feedback": feedback,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": self._timestamp()
         }
         self.attestations.append(attestation)
+        if self.storage is not None:
+            self._store_attestation(tx, attestation)
         
         if tx["from"] in self.agents:
-            self.agents[tx["from"]].ratings.append({
-                "rating": rating,
-                "tx_hash": tx_hash,
-                "feedback": feedback
-            })
-            self.agents[tx["from"]].calculate_reputation()
+            self.agents[tx["from"]].add_rating(rating, tx_hash, feedback, self._time())
+            self._rescore(self.agents[tx["from"]])
         
         return attestation
     
+    @journaled
+    def submit_transactions_batch(self, events: Iterable[Tuple[str, str, float]]) -> List[Dict]:
+        """Record many transactions at once
+        
+        events are (from_addr, to_addr, amount) tuples. The batch shares one
+        timestamp and one draw for its hashes, and each agent's
+        transaction count is bumped once and each party rescored once.
+        """
+        events = list(events)
+        timestamp = self._timestamp()
+        hashes = self._draw(lambda: self.ids.tx_hashes(len(events)))
+        tx_counts = defaultdict(int)
+        txs = []
+        for i, (from_addr, to_addr, amount) in enumerate(events):
+            tx = {
+                "tx_hash": hashes[i],
+                "from": from_addr,
+                "to": to_addr,
+                "amount": amount,
+                "timestamp": timestamp,
+                "status": "pending"
+            }
+            self.transactions[tx["tx_hash"]] = tx
+            txs.append(tx)
+            tx_counts[from_addr] += 1
+            tx_counts[to_addr] += 1
+        
+        if self.storage is not None:
+            for tx in txs:
+                self.storage.save_transaction(tx)
+        
+        for addr, count in tx_counts.items():
+            if addr in self.agents:
+                self.agents[addr].transactions_count += count
+                self._rescore(self.agents[addr])
+        
+        return txs
+    
+    @journaled
+    def attest_batch(self, attestations: Iterable[Tuple]) -> List[Dict]:
+        """Submit many ratings at once
+        
+        attestations are (tx_hash, rating) or (tx_hash, rating, feedback)
+        tuples. Each touched agent is rescored once after the whole batch;
+        unknown or already-attested transactions get an error entry in the
+        results.
+        """
+        timestamp = self._timestamp()
+        at = self._time()
+        touched: Dict[str, None] = {}  # Insertion-ordered set
+        results = []
+        for tx_hash, rating, *rest in attestations:
+            feedback = rest[0] if rest else ""
+            tx = self.transactions.get(tx_hash)
+            if not tx:
+                results.append({"error": "Transaction not found", "tx_hash": tx_hash})
+                continue
+            if tx["status"] == "completed":
+                results.append({"error": "Transaction already attested", "tx_hash": tx_hash})
+                continue
+            if not valid_rating(rating):
+                results.append({"error": "Rating out of range", "tx_hash": tx_hash})
+                continue
+            
+            tx["status"] = "completed"
+            attestation = {
+                "tx_hash": tx_hash,
+                "from": tx["from"],
+                "to": tx["to"],
+                "rating": rating,
+                "feedback": feedback,
+                "timestamp": timestamp
+            }
+            self.attestations.append(attestation)
+            results.append(attestation)
+            if self.storage is not None:
+                self._store_attestation(tx, attestation)
+            
+            if tx["from"] in self.agents:
+                self.agents[tx["from"]].add_rating(rating, tx_hash, feedback, at)
+                touched[tx["from"]] = None
+        
+        for addr in touched:
+            if addr in self.agents:
+                self._rescore(self.agents[addr])
+        
+        return results
+    
+    @journaled
     def slash_agent(self, address: str, reason: str) -> Dict:
         if address not in self.agents:
             return {"error": "Agent not found"}
@@ -397,12 +881,15 @@ class ARPProtocol:
         agent = self.agents[address]
         slash_amount = agent.staked_usdc * 0.5
         agent.staked_usdc -= slash_amount
-        agent.ratings.append({
-            "rating": 1,
-            "tx_hash": "SLASH",
-            "feedback": f"Slashed for: {reason}"
+        agent.add_rating(1, "SLASH", f"Slashed for: {reason}", self._time())
+        self._rescore(agent)
+        self.slashing_events.append({
+            "address": address,
+            "amount": slash_amount,
+            "reason": reason,
+            "source": "slash",
+            "timestamp": self._timestamp()
         })
-        agent.calculate_reputation()
         
         return {
             "agent": agent.name,
@@ -411,8 +898,353 @@ class ARPProtocol:
             "reason": reason
         }
     
+    @journaled
+    def verify_reputation(self, address: str) -> Dict:
+        """Check an agent's rating aggregates and rescore it if they had drifted"""
+        if address not in self.agents:
+            return {"error": "Agent not found"}
+        
+        agent = self.agents[address]
+        result = agent.verify_reputation()
+        if not result["ok"]:
+            self._rescore(agent)
+        return result
+    
+    def rescore_all(self, verify: bool = False) -> Dict:
+        """Recompute every agent's reputation in one pass
+        
+        Vectorized with NumPy when it is installed (see arp_batch), scalar
+        otherwise. verify=True re-runs the scalar formula and reports the
+        largest difference from the batch result.
+        """
+        with self._holding_agents():  # The pass touches every agent
+            self.flush_scores()  # Dirty agents also need their stake and storage rows refreshed
+            agents = list(self.agents.values())
+            if arp_batch.HAS_NUMPY and agents:
+                np = arp_batch.np
+                scores = arp_batch.reputation_scores(
+                    arp_batch.column(agents, "rating_sum"),
+                    arp_batch.column(agents, "rating_count"),
+                    arp_batch.column(agents, "staked_usdc") + arp_batch.column(agents, "delegated_stake"),
+                    arp_batch.column(agents, "transactions_count"),
+                    RATING_WEIGHT, STAKE_WEIGHT, TX_WEIGHT,
+                    extra_terms=[
+                        np.fromiter((len(a.oracles_trusted) for a in agents), np.float64, len(agents)) * ORACLE_WEIGHT,
+                        arp_batch.column(agents, "council_votes") * COUNCIL_WEIGHT,
+                    ]
+                ).tolist()
+                tiers = arp_batch.tier_codes(np.asarray(scores), TIER_BOUNDS).tolist()
+                for agent, score, code in zip(agents, scores, tiers):
+                    agent.reputation_score = score
+                    agent.tier_code = code
+            else:
+                scores = [agent.calculate_reputation() for agent in agents]
+            self.leaderboard.rebuild((a.address, a.reputation_score) for a in agents)
+            self.leaderboard_version += 1
+            
+            result = {"agents": len(agents), "vectorized": arp_batch.HAS_NUMPY}
+            if verify:
+                result["max_drift"] = arp_batch.max_drift(
+                    scores, [agent.calculate_reputation() for agent in agents]
+                )
+            return result
+    
+    # === Persistence ===
+    def enable_persistence(
+        self,
+        directory: str,
+        group_size: int = 64,
+        snapshot_every: int = 100_000,
+        fsync: bool = True,
+        checkpoint: bool = True
+    ):
+        """Log every state change to a WAL in directory
+        
+        A snapshot is taken every snapshot_every logged calls (and right
+        away unless checkpoint=False), after which the WAL starts over.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.persist_dir = directory
+        self.snapshot_every = snapshot_every
+        self.wal = WriteAheadLog(
+            os.path.join(directory, self.WAL_FILE),
+            group_size=group_size,
+            fsync=fsync,
+            start_lsn=snapshot_lsn(os.path.join(directory, self.SNAPSHOT_FILE))
+        )
+        if checkpoint:
+            self.checkpoint()
+    
+    def checkpoint(self) -> int:
+        """Snapshot the full state and truncate the WAL; returns the snapshot LSN"""
+        if self.wal is None:
+            raise RuntimeError("Persistence is not enabled")
+        self.wal.flush()
+        lsn = self.wal.last_lsn
+        save_snapshot(
+            os.path.join(self.persist_dir, self.SNAPSHOT_FILE),
+            self._snapshot_state(),
+            lsn,
+            fsync=self.wal.fsync
+        )
+        self.wal.reset()
+        self._ops_since_snapshot = 0
+        self.export_agent_table(os.path.join(self.persist_dir, self.AGENT_TABLE_FILE))
+        return lsn
+    
+    def close(self):
+        """Flush pending WAL records and storage writes, and unmap any agent table"""
+        self.flush_scores()
+        if self.wal is not None:
+            self.wal.close()
+            self.wal = None
+        if self.storage is not None:
+            self.storage.flush()
+        if self.agent_cache is not None:
+            self.agent_cache.close()
+        if self.agent_table is not None:
+            self.agent_table.close()
+            self.agent_table = None
+    
+    def export_agent_table(self, path: str) -> int:
+        """Write the agent/score table in the fixed mmap layout; returns the row count"""
+        self.flush_scores()
+        return write_agent_table(path, (self.agents[address] for address in self.agent_ids))
+    
+    def open_agent_table(self, path: str) -> AgentTable:
+        """Map an exported agent table read-only for lookups without loading state
+        
+        A directory means the table written there by checkpoint().
+        """
+        if os.path.isdir(path):
+            path = os.path.join(path, self.AGENT_TABLE_FILE)
+        if self.agent_table is not None:
+            self.agent_table.close()
+        self.agent_table = AgentTable(path)
+        return self.agent_table
+    
+    def get_agent_row(self, address: str) -> Optional[Dict]:
+        """Score-table row for an agent, from live state or the mapped table"""
+        agent = self.agents.get(address)
+        if agent is None:
+            return self.agent_table.get(address) if self.agent_table is not None else None
+        self._fresh(agent)
+        return {
+            "agent_id": agent.agent_id,
+            "address": agent.address,
+            "name": agent.name,
+            "staked_usdc": agent.staked_usdc,
+            "delegated_stake": agent.delegated_stake,
+            "reputation_score": agent.reputation_score,
+            "tier_code": agent.tier_code,
+            "rating_sum": agent.rating_sum,
+            "rating_count": agent.rating_count,
+            "transactions_count": agent.transactions_count
+        }
+    
+    @classmethod
+    def recover(
+        cls,
+        directory: str,
+        group_size: int = 64,
+        snapshot_every: int = 100_000,
+        fsync: bool = True,
+        **kwargs
+    ) -> "ARPProtocol":
+        """Load the latest snapshot, replay the WAL tail and keep logging"""
+        protocol = cls(**kwargs)
+        lsn = 0
+        snapshot = load_snapshot(os.path.join(directory, cls.SNAPSHOT_FILE))
+        if snapshot:
+            lsn, state = snapshot
+            protocol._restore_state(state)
+        for lsn, record in WriteAheadLog.read(os.path.join(directory, cls.WAL_FILE), after_lsn=lsn):
+            protocol._apply_record(record)
+        protocol.enable_persistence(directory, group_size, snapshot_every, fsync, checkpoint=False)
+        return protocol
+    
+    def _apply_record(self, record: Dict):
+        """Re-run one logged call with its recorded ids and timestamps
+        
+        Only the exception the original call raised is tolerated, and every
+        recorded value must be used; anything else means recovery would not
+        reproduce the logged state.
+        """
+        self._replay = deque(record["draws"])
+        expected = record.get("error")
+        try:
+            getattr(self, record["op"])(*record["args"], **record["kwargs"])
+        except ReplayDivergedError:
+            raise
+        except Exception as e:
+            if type(e).__name__ != expected:
+                raise ReplayDivergedError(
+                    f"WAL replay of {record['op']} raised {type(e).__name__}, logged {expected}"
+                ) from e
+        else:
+            if expected is not None:
+                raise ReplayDivergedError(f"WAL replay of {record['op']} succeeded, logged {expected}")
+        finally:
+            left, self._replay = len(self._replay), None
+        if left:
+            raise ReplayDivergedError(f"WAL replay of {record['op']} left {left} recorded values unused")
+    
+    def _snapshot_state(self) -> Dict:
+        return {
+            "agents": [self.agents[address].to_state() for address in self.agent_ids],
+            "transactions": list(self.transactions.values()),
+            "attestations": self.attestations,
+            "delegations": self.delegations,
+            "oracles": list(self.oracles),
+            "markets": self.markets,
+            "nfts": self.nfts,
+            "council_cases": self.council_cases,
+            "slashing_events": self.slashing_events,
+            "expiries": self.expiries.entries()
+        }
+    
+    def _restore_state(self, state: Dict):
+        for agent_state in state["agents"]:
+            agent = Agent.from_state(agent_state)
+            agent.ratings.retention = self.rating_retention
+            self.agent_ids.append(agent.address)
+            self.agents[agent.address] = agent
+            self._rescore(agent)
+        self.transactions = {tx["tx_hash"]: tx for tx in state["transactions"]}
+        self.attestations = state["attestations"]
+        self.delegations = state["delegations"]
+        self.oracles = {address: self.agents[address].name for address in state["oracles"]}
+        self.markets = state["markets"]
+        self.nfts = state["nfts"]
+        self.council_cases = state["council_cases"]
+        self.slashing_events = state.get("slashing_events", [])
+        self.expiries = ExpiryQueue.from_entries(state["expiries"])
+    
+    def get_agent(self, address: str) -> Optional[Agent]:
+        agent = self.agents.get(address)
+        return self._fresh(agent) if agent is not None else None
+    
+    def get_agent_by_id(self, agent_id: int) -> Optional[Agent]:
+        if not 0 <= agent_id < len(self.agent_ids):
+            return None
+        return self.get_agent(self.agent_ids[agent_id])
+    
     def get_all_agents(self) -> List[Dict]:
-        return [a.to_dict() for a in self.agents.values()]
+        return list(self.iter_agents())
+    
+    def iter_agents(self) -> Iterator[Dict]:
+        """Agent dicts one at a time, in registration order"""
+        self.flush_scores()
+        for address in self.agent_ids:
+            yield self.agents[address].to_dict()
+    
+    def export(self, kind: str, target: Any, fmt: str = "jsonl", chunk_size: int = 1000) -> Dict:
+        """Stream agents, transactions, attestations, delegations, slashing
+        events or the leaderboard to a binary file or socket (see arp_export)
+        
+        fmt is "jsonl" or "json" (one streamed array).
+        """
+        sources = {
+            "agents": lambda: (dict(self.agents[a].to_dict(), address=a) for a in self.agent_ids),
+            "transactions": lambda: iter(self.transactions.values()),
+            "attestations": lambda: iter(self.attestations),
+            "delegations": lambda: iter(self.delegations),
+            "slashing_events": lambda: iter(self.slashing_events),
+            "leaderboard": self._iter_leaderboard,
+        }
+        if kind not in sources:
+            return {"error": f"Unknown export: {kind}"}
+        if fmt not in FORMATS:
+            return {"error": f"Unknown format: {fmt}"}
+        self.flush_scores()
+        return {"kind": kind, "exported": export_records(sources[kind](), target, fmt, chunk_size)}
+    
+    def get_transaction_history(
+        self,
+        address: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Dict]:
+        """Transactions sent or received by an agent, newest first
+        
+        since/until are ISO timestamps. Served by the storage indexes when a
+        backend is attached, otherwise by scanning the in-memory transaction
+        dicts; either way rows come back as transaction dicts, and both
+        compare and order timestamps at the microsecond precision storage
+        keeps (ties by tx_hash).
+        """
+        if self.storage is not None:
+            rows = self.storage.transaction_history(address, since, until, limit, offset)
+            return [engine_transaction(row) for row in rows]
+        since_us = parse_iso(since) // 1000 if since else None
+        until_us = parse_iso(until) // 1000 if until else None
+        matches = [
+            tx for tx in self.transactions.values()
+            if address in (tx["from"], tx["to"])
+            and (since_us is None or tx["timestamp"] // 1000 >= since_us)
+            and (until_us is None or tx["timestamp"] // 1000 <= until_us)
+        ]
+        matches.sort(key=lambda tx: (-(tx["timestamp"] // 1000), tx["tx_hash"]))
+        return matches[offset:offset + limit]
+    
+    def _iter_leaderboard(self) -> Iterator[Dict]:
+        for rank, address in enumerate(self.leaderboard, 1):
+            agent = self.agents[address]
+            yield {"rank": rank, "address": address, "name": agent.name, "reputation_score": agent.reputation_score}
+    
+    def get_leaderboard(self, limit: int = 10, offset: int = 0) -> List[Dict]:
+        """Top agents by reputation, served from the leaderboard index"""
+        self.flush_scores()
+        return [
+            dict(self.agents[address].to_dict(), rank=offset + i)
+            for i, (address, _) in enumerate(self.leaderboard.page(offset, limit), 1)
+        ]
+    
+    def get_leaderboard_payload(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        if_none_match: Optional[str] = None
+    ) -> Dict:
+        """Encoded leaderboard page for serving, cached until the data changes
+        
+        Returns the page's ETag and version; the JSON body is None (not
+        modified) when if_none_match already names the current ETag.
+        """
+        self.flush_scores()
+        etag, body = self.leaderboard_pages.get(
+            ("reputation_score", offset, limit),
+            self.leaderboard_version,
+            lambda: self.get_leaderboard(limit, offset)
+        )
+        not_modified = if_none_match == etag
+        return {
+            "etag": etag,
+            "version": self.leaderboard_version,
+            "not_modified": not_modified,
+            "body": None if not_modified else body
+        }
+    
+    def get_rank(self, address: str) -> Optional[int]:
+        """1-based leaderboard rank of an agent"""
+        self.flush_scores()
+        return self.leaderboard.rank(address)
+    
+    def get_agents_by_score(
+        self,
+        min_score: float,
+        max_score: float = float('inf'),
+        offset: int = 0,
+        limit: int = 50
+    ) -> List[Dict]:
+        """Page through agents whose reputation falls within a score range"""
+        self.flush_scores()
+        return [
+            self.agents[address].to_dict()
+            for address, _ in self.leaderboard.score_range(min_score, max_score, offset, limit)
+        ]
 
 
 class ARPEnhancedDemo:
@@ -609,13 +1441,8 @@ class ARPEnhancedDemo:
         
         # Show leaderboard
         print("\n🏆 Final Leaderboard:")
-        agents = sorted(
-            self.arp.get_all_agents(),
-            key=lambda x: x.get("reputation_score", 0),
-            reverse=True
-        )
-        for i, a in enumerate(agents[:5], 1):
-            print(f"   {i}. {a['name']}: {a.get('reputation_tier', 'NEW')} ({a.get('reputation_score', 0):.1f})")
+        for a in self.arp.get_leaderboard(5):
+            print(f"   {a['rank']}. {a['name']}: {a.get('reputation_tier', 'NEW')} ({a.get('reputation_score', 0):.1f})")
 
 
 def main():